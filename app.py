@@ -5,29 +5,67 @@ Flask application for WasteSnap
 ============================================
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import (Flask, Blueprint, Request, Response, current_app, render_template, request, redirect,
+                   url_for, flash, session, g, jsonify, stream_with_context)
 from datetime import datetime
+import hashlib
+import json
+import math
 import os
-import uuid
+import sqlite3
+import time
+import click
 from werkzeug.utils import secure_filename
-from auth import init_db, signup as auth_signup, signin as auth_signin
-from reports_db import init_reports_db, create_report, get_all_reports, get_reports_by_user
+from werkzeug.middleware.proxy_fix import ProxyFix
+import assets
+import auth
+import db
+import metrics
+import reports_db
+from auth import init_db, signup as auth_signup, signin as auth_signin, get_user_by_id
+from reports_db import (init_reports_db, create_report, iter_reports_by_user, ReportStream,
+                        get_reports_near, get_reports_in_bbox, get_cluster_tile, iter_reports,
+                        get_reports_version, update_report_status, update_report_statuses,
+                        get_status_history, get_report_changes, wait_for_report_changes,
+                        get_report_stats, rebuild_report_stats, rebuild_report_clusters,
+                        search_reports, fill_missing_areas, iter_reports_without_variants,
+                        MAX_CLUSTER_ZOOM, REPORT_MERGED_MESSAGE, PUBLIC_REPORT_FIELDS,
+                        DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+from geo import parse_coordinates, tile_bounds, valid_coordinates
+from geocoder import configure_geocoder, get_gazetteer, reverse_geocode
+from images import submit_report_photo, process_report_photo
+from uploads import UploadSpool, store_stream
+from importer import import_reports, DEFAULT_BATCH_SIZE
+from exporter import (export_chunks, export_reports, available_formats, default_format,
+                      EXPORT_FORMATS, EXPORT_MIMETYPES, EXPORT_EXTENSIONS)
+from cache import configure_cache, RedisCache
+from sessions import configure_sessions, revoke_user_sessions
 
-# Initialize Flask app
-app = Flask(__name__)
+# Every page, API endpoint and CLI command - registered on the app by create_app()
+bp = Blueprint('main', __name__, cli_group=None)
 
-# Secret key for session management (change this in production!)
-app.secret_key = 'your-secret-key-change-in-production'
-
-# Configure upload folder (for future image uploads)
-UPLOAD_FOLDER = 'static/uploads'
+# Default upload folder (content-addressed photo store, served at /uploads)
+UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+# Filter choices offered on the find-waste page
+WASTE_TYPES = ['Plastic', 'Organic', 'Construction debris', 'E-waste', 'Mixed / Other']
+SEVERITIES = ['Low', 'Medium', 'High']
+REPORT_STATUSES = ['Pending', 'In Progress', 'Cleaned']
+
+# Reports serialized per chunk of a streamed API response
+STREAM_CHUNK_ROWS = 100
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Template fragments buffered per chunk of a streamed page
+STREAM_BUFFER_SIZE = 64
+
+# Server-Sent Events change stream: idle wait between checks, connection
+# lifetime (clients reconnect with Last-Event-ID) and client retry delay.
+# Each open stream holds one of a worker's few gthread threads, so streams
+# are kept short and clients reconnect instead of holding the thread.
+SSE_POLL_SECONDS = 10
+SSE_MAX_SECONDS = 25
+SSE_RETRY_MS = 3000
 
 
 # ============================================
@@ -39,53 +77,216 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+class UploadRequest(Request):
+    """Request whose file uploads are spooled straight into the upload folder"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSpool(current_app.config['UPLOAD_FOLDER'])
+
 def save_uploaded_file(file):
     """
-    Save uploaded file with unique filename
+    Save uploaded file into the content-addressed upload store
+    
+    Identical photos (e.g. a retried submission) share one stored file.
     
     Args:
         file: Flask file object
     
     Returns:
-        str: Relative path to saved file, or None if error
+        str: Path of the saved file relative to UPLOAD_FOLDER, or None if error
     """
     if file and allowed_file(file.filename):
-        # Generate unique filename
         file_ext = file.filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}.{file_ext}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
         
-        # Save file
-        file.save(filepath)
+        # Uploads were hashed while Werkzeug wrote them to disk (see UploadRequest) -
+        # just move them to their content address. Other streams are copied in.
+        start = time.perf_counter()
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        if isinstance(file.stream, UploadSpool):
+            photo_path, is_new = file.stream.store(file_ext)
+        else:
+            photo_path, is_new = store_stream(file.stream, file_ext, upload_folder)
+        if metrics.is_enabled():
+            metrics.record_upload(os.path.getsize(os.path.join(upload_folder, photo_path)),
+                                  time.perf_counter() - start, is_new)
         
-        # Return relative path for database storage
-        return f"static/uploads/{unique_filename}"
+        # Return path relative to the upload folder for database storage
+        return photo_path
     return None
 
+def parse_date_arg(value):
+    """
+    Validate a YYYY-MM-DD query string value
+    
+    Args:
+        value: Raw query string value
+    
+    Returns:
+        str or None: The date string if valid, None otherwise
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+def parse_timestamp_arg(value):
+    """
+    Parse an ISO 8601 timestamp query argument into the database's format
+    
+    Args:
+        value: e.g. '2025-06-01T08:30:00' or '2025-06-01 08:30:00.250'
+    
+    Returns:
+        str or None: 'YYYY-MM-DD HH:MM:SS.fff' (UTC, as stored), None if missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    except ValueError:
+        return None
+
+def get_report_filters(args):
+    """
+    Extract report listing filters from the query string
+    
+    Unknown values are dropped rather than passed to the database.
+    
+    Args:
+        args: request.args
+    
+    Returns:
+        dict: Filters accepted by reports_db.ReportStream
+    """
+    waste_type = args.get('waste_type')
+    severity = args.get('severity')
+    report_status = args.get('status')
+    
+    return {
+        'waste_type': waste_type if waste_type in WASTE_TYPES else None,
+        'severity': severity if severity in SEVERITIES else None,
+        'report_status': report_status if report_status in REPORT_STATUSES else None,
+        'date_from': parse_date_arg(args.get('from')),
+        'date_to': parse_date_arg(args.get('to'))
+    }
+
+def render_listing(template_name, **context):
+    """
+    Render a listing page, streaming it when STREAM_TEMPLATES is enabled
+    
+    Streaming sends the page head straight away and each report card as its
+    row is read, so time to first byte and memory don't grow with the number
+    of reports. Jinja output is sent in chunks of STREAM_BUFFER_SIZE fragments.
+    
+    Args:
+        template_name: Template to render
+        **context: Template variables (report lists may be generators)
+    
+    Returns:
+        Response or str: Streamed response, or the fully rendered page
+    """
+    if not current_app.config['STREAM_TEMPLATES']:
+        return render_template(template_name, **context)
+    
+    current_app.update_template_context(context)
+    stream = current_app.jinja_env.get_template(template_name).stream(context)
+    stream.enable_buffering(STREAM_BUFFER_SIZE)
+    return Response(stream_with_context(stream), mimetype='text/html')
+
+def ndjson_stream(reports):
+    """
+    Serialize streamed reports as NDJSON, a few rows per chunk
+    
+    A page with more results after it ends with a {"next_cursor": ...} line.
+    
+    Args:
+        reports: (report, next_cursor) pairs from reports_db.iter_reports
+    """
+    lines = []
+    for report, next_cursor in reports:
+        lines.append(json.dumps(report, separators=(',', ':')))
+        if next_cursor:
+            lines.append(json.dumps({'next_cursor': next_cursor}))
+        if len(lines) >= STREAM_CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def json_stream(reports):
+    """
+    Serialize streamed reports as one JSON document, {"reports": [...], "next_cursor": ...}
+    
+    Args:
+        reports: (report, next_cursor) pairs from reports_db.iter_reports
+    """
+    yield '{"reports":['
+    items = []
+    separator = ''
+    next_cursor = None
+    for report, next_cursor in reports:
+        items.append(json.dumps(report, separators=(',', ':')))
+        if len(items) >= STREAM_CHUNK_ROWS:
+            yield separator + ','.join(items)
+            items = []
+            separator = ','
+    if items:
+        yield separator + ','.join(items)
+    yield f'],"next_cursor":{json.dumps(next_cursor)}}}'
+
+def report_change_events(since):
+    """
+    Server-Sent Events for report changes after a change sequence number
+    
+    Each changed report is sent as a 'report' event whose id is its
+    change_seq. While idle the generator waits for writes and sends a
+    keepalive comment every SSE_POLL_SECONDS; after SSE_MAX_SECONDS it ends
+    so the client reconnects (resuming from Last-Event-ID).
+    
+    Args:
+        since: Last change_seq the client has seen
+    """
+    deadline = time.monotonic() + SSE_MAX_SECONDS
+    yield f'retry: {SSE_RETRY_MS}\n\n'
+    
+    while time.monotonic() < deadline:
+        changes = get_report_changes(since)
+        if changes:
+            events = []
+            for report in changes:
+                since = report.change_seq
+                data = json.dumps(report.to_dict(PUBLIC_REPORT_FIELDS), separators=(',', ':'))
+                events.append(f'id: {since}\nevent: report\ndata: {data}\n\n')
+            yield ''.join(events)
+        elif not wait_for_report_changes(since, min(SSE_POLL_SECONDS, max(0, deadline - time.monotonic()))):
+            yield ': keepalive\n\n'
+
 
 # ============================================
 # ROUTES
 # ============================================
 
-@app.route('/')
+@bp.route('/')
 def index():
     """Home page / Landing page"""
     return render_template('index.html')
 
 
-@app.route('/get-started')
+@bp.route('/get-started')
 def get_started():
     """Get Started page - redirects to signup or dashboard"""
     # Check if user is logged in (session-based check)
     if 'user_id' in session:
         # User is logged in, redirect to dashboard
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     else:
         # User is not logged in, redirect to signup
-        return redirect(url_for('signup'))
+        return redirect(url_for('main.signup'))
 
 
-@app.route('/signin', methods=['GET', 'POST'])
+@bp.route('/signin', methods=['GET', 'POST'])
 def signin():
     """Sign In page"""
     if request.method == 'POST':
@@ -94,22 +295,24 @@ def signin():
         password = request.form.get('password')
         
         # Validate credentials using auth module
-        success, message, user_data = auth_signin(email, password)
+        success, message, user_data = auth_signin(email, password, request.remote_addr)
         
         if success and user_data:
-            # Set session
+            # Set session, under a new session ID
+            session.clear()
+            session.regenerate()
             session['user_id'] = user_data['id']
             session['user_email'] = user_data['email']
             session['user_name'] = user_data['name']
             flash(message, 'success')
-            return redirect(url_for('index'))
+            return redirect(url_for('main.index'))
         else:
             flash(message, 'error')
     
     return render_template('signin.html')
 
 
-@app.route('/signup', methods=['GET', 'POST'])
+@bp.route('/signup', methods=['GET', 'POST'])
 def signup():
     """Sign Up page"""
     if request.method == 'POST':
@@ -133,35 +336,35 @@ def signup():
                 # Don't set session - user needs to sign in
                 # Redirect to signin page with success message
                 flash('Signup successful! Please sign in to continue.', 'success')
-                return redirect(url_for('signin'))
+                return redirect(url_for('main.signin'))
             else:
                 flash(message, 'error')
     
     return render_template('signup.html')
 
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 def dashboard():
     """User dashboard - requires login"""
     # Check if user is logged in
     if 'user_id' not in session:
         flash('Please log in to access the dashboard', 'warning')
-        return redirect(url_for('signin'))
+        return redirect(url_for('main.signin'))
     
-    # Fetch user's reports from database
+    # Stream the user's reports from the database
     user_id = session['user_id']
-    user_reports = get_reports_by_user(user_id)
+    user_reports = iter_reports_by_user(user_id)
     
-    return render_template('dashboard.html', reports=user_reports)
+    return render_listing('dashboard.html', reports=user_reports)
 
 
-@app.route('/snap', methods=['GET', 'POST'])
+@bp.route('/snap', methods=['GET', 'POST'])
 def snap():
     """Snap waste page - upload photo and location"""
     # Check if user is logged in
     if 'user_id' not in session:
         flash('Please log in to report waste', 'warning')
-        return redirect(url_for('signin'))
+        return redirect(url_for('main.signin'))
     
     if request.method == 'POST':
         # Get form data
@@ -178,6 +381,16 @@ def snap():
             flash('Location is required. Please enable geolocation.', 'error')
             return redirect(request.url)
         
+        # Reject bad coordinates (including nan/inf) before storing or geocoding anything
+        try:
+            latitude_float = float(latitude)
+            longitude_float = float(longitude)
+        except ValueError:
+            latitude_float = longitude_float = math.nan
+        if not valid_coordinates(latitude_float, longitude_float):
+            flash('Invalid coordinates', 'error')
+            return redirect(request.url)
+        
         if not waste_type:
             flash('Waste type is required', 'error')
             return redirect(request.url)
@@ -204,19 +417,14 @@ def snap():
         user_id = session['user_id']
         username = session.get('user_name', '')
         
-        # Create report in database
-        try:
-            latitude_float = float(latitude)
-            longitude_float = float(longitude)
-        except ValueError:
-            flash('Invalid coordinates', 'error')
-            return redirect(request.url)
-        
         # Use empty string for optional fields if not provided
         description = description.strip() if description else None
         severity = severity if severity else None
         landmark = landmark.strip() if landmark else None
         readable_area = readable_area.strip() if readable_area else None
+        if not readable_area:
+            # The browser couldn't name the place - look it up locally
+            readable_area = reverse_geocode(latitude_float, longitude_float)
         
         success, message, report_id = create_report(
             user_id=user_id,
@@ -231,65 +439,610 @@ def snap():
             landmark=landmark
         )
         
-        if success:
+        if success and message == REPORT_MERGED_MESSAGE:
+            # Same pile already reported nearby - counted on that report
+            flash(message, 'success')
+            return redirect(url_for('main.index'))
+        elif success:
+            # Resize, thumbnail and strip EXIF off the request thread
+            submit_report_photo(report_id, photo_path, current_app.config['UPLOAD_FOLDER'])
             flash('Waste report submitted successfully!', 'success')
-            return redirect(url_for('index'))
+            return redirect(url_for('main.index'))
         else:
             flash(f'Error submitting report: {message}', 'error')
     
     return render_template('snap.html')
 
-@app.route('/find-waste')
+@bp.route('/find-waste')
 def find_waste():
     """Find waste location page - shows all waste reports"""
     # Check if user is logged in
     if 'user_id' not in session:
         flash('Please log in to view waste locations', 'warning')
-        return redirect(url_for('signin'))
+        return redirect(url_for('main.signin'))
+    
+    filters = get_report_filters(request.args)
+    query = request.args.get('q', '').strip()
+    near = parse_coordinates(request.args.get('near'))
+    radius = request.args.get('radius', 1000, type=int)
+    next_cursor = None
+    
+    if query:
+        # Search mode - best text matches first, paged by rank
+        reports, next_cursor = search_reports(query, cursor=request.args.get('cursor'), **filters)
+    elif near:
+        # Proximity mode - nearest reports within the radius, no paging
+        reports = get_reports_near(near[0], near[1], radius, **filters)
+    else:
+        # One page of reports matching the filters, read while the page renders
+        reports = ReportStream(
+            cursor=request.args.get('cursor'),
+            direction=request.args.get('dir', 'next'),
+            **filters
+        )
+    
+    # Query string for building filter-preserving page links
+    filter_args = {
+        'waste_type': filters['waste_type'],
+        'severity': filters['severity'],
+        'status': filters['report_status'],
+        'from': filters['date_from'],
+        'to': filters['date_to']
+    }
+    filter_args = {key: value for key, value in filter_args.items() if value}
+    
+    return render_listing(
+        'reports.html',
+        reports=reports,
+        next_cursor=next_cursor,
+        filters=filter_args,
+        query=query,
+        near=near,
+        radius=radius,
+        waste_types=WASTE_TYPES,
+        severities=SEVERITIES,
+        statuses=REPORT_STATUSES
+    )
+
+
+@bp.route('/api/clusters/<int:z>/<int:x>/<int:y>')
+def cluster_tile(z, x, y):
+    """Aggregated report clusters for one map tile (JSON); truncated is set when points were left out"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    if z > MAX_CLUSTER_ZOOM:
+        # Zoomed in past the aggregates - return individual reports as points
+        if not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+            return jsonify({'error': 'Invalid tile'}), 400
+        
+        min_lat, min_lon, max_lat, max_lon = tile_bounds(z, x, y)
+        reports = get_reports_in_bbox(min_lat, min_lon, max_lat, max_lon, MAX_PAGE_SIZE, open_only=True)
+        clusters = [
+            {
+                'latitude': report['latitude'],
+                'longitude': report['longitude'],
+                'count': 1,
+                'waste_types': {report['waste_type']: 1},
+                'severities': {report['severity'] or 'Unspecified': 1},
+                'report_id': report['id']
+            }
+            for report in reports
+        ]
+        # The newest MAX_PAGE_SIZE reports only - the client should zoom in for the rest
+        truncated = len(reports) >= MAX_PAGE_SIZE
+    else:
+        clusters = get_cluster_tile(z, x, y)
+        if clusters is None:
+            return jsonify({'error': 'Invalid tile'}), 400
+        truncated = False
+    
+    response = jsonify({'z': z, 'x': x, 'y': y, 'clusters': clusters, 'truncated': truncated})
+    response.headers['Cache-Control'] = 'private, max-age=30'
+    return response
+
+
+@bp.route('/api/reports')
+def api_reports():
+    """
+    Stream reports as NDJSON (default) or as a chunked JSON document
+    
+    Query parameters: the /find-waste filters, cursor, limit, format
+    (ndjson or json) and fields (comma-separated report fields). The ETag
+    covers the report change sequence and the query, so an unchanged page
+    is answered with 304 Not Modified without touching the reports.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    fields = request.args.get('fields')
+    fields = tuple(fields.split(',')) if fields else PUBLIC_REPORT_FIELDS
+    unknown = [field for field in fields if field not in PUBLIC_REPORT_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    
+    output_format = request.args.get('format', 'ndjson')
+    if output_format not in ('ndjson', 'json'):
+        return jsonify({'error': 'format must be ndjson or json'}), 400
+    
+    query = sorted(request.args.items(multi=True))
+    etag = hashlib.sha256(f"{get_reports_version()}:{query}".encode()).hexdigest()[:32]
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        reports = iter_reports(
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            fields=fields,
+            **get_report_filters(request.args)
+        )
+        if output_format == 'json':
+            response = Response(stream_with_context(json_stream(reports)), mimetype='application/json')
+        else:
+            response = Response(stream_with_context(ndjson_stream(reports)), mimetype='application/x-ndjson')
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@bp.route('/api/reports/changes')
+def report_changes():
+    """
+    Reports created or updated since a change sequence number (JSON)
+    
+    Query parameters: since (next_since from the previous call, 0 at first)
+    and limit. Keep calling with next_since while has_more is true.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    since = request.args.get('since', 0, type=int)
+    changes = get_report_changes(since, request.args.get('limit', MAX_PAGE_SIZE, type=int))
+    next_since = changes[-1].change_seq if changes else since
+    
+    response = jsonify({
+        'reports': [report.to_dict(PUBLIC_REPORT_FIELDS) for report in changes],
+        'next_since': next_since,
+        'has_more': get_reports_version() > next_since
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@bp.route('/api/reports/changes/stream')
+def report_changes_stream():
+    """Server-Sent Events stream of report changes, resumable via Last-Event-ID or ?since="""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
     
-    # Get all reports
-    reports = get_all_reports()
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', 0, type=int)
     
-    return render_template('reports.html', reports=reports)
+    response = Response(stream_with_context(report_change_events(since)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # keep reverse proxies from buffering events
+    return response
 
+@bp.route('/api/stats')
+def stats():
+    """
+    Report counts by waste type, severity, status, area and day (JSON)
+    
+    Served from the pre-aggregated report_stats table. Query parameters:
+    from / to (YYYY-MM-DD) bound the daily counts.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    report_stats = get_report_stats(
+        date_from=parse_date_arg(request.args.get('from')),
+        date_to=parse_date_arg(request.args.get('to'))
+    )
+    if report_stats is None:
+        return jsonify({'error': 'Statistics are unavailable'}), 500
+    
+    response = jsonify(report_stats)
+    response.headers['Cache-Control'] = 'private, max-age=30'
+    return response
 
-@app.route('/logout')
+@bp.route('/api/reports/export')
+def export_reports_download():
+    """
+    Download matching reports as Parquet (when pyarrow is installed) or gzip CSV
+    
+    Query parameters: the /find-waste filters, format (parquet or csv) and
+    since_id for incremental exports. The file is streamed as it is written.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    export_format = request.args.get('format') or default_format()
+    if export_format not in available_formats():
+        return jsonify({'error': f"format must be one of: {', '.join(available_formats())}"}), 400
+    
+    since_id = request.args.get('since_id', 0, type=int)
+    chunks = export_chunks(export_format, since_id, **get_report_filters(request.args))
+    
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_MIMETYPES[export_format])
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename="reports-since-{since_id}.{EXPORT_EXTENSIONS[export_format]}"'
+    )
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@bp.route('/api/reports/<int:report_id>/status', methods=['POST'])
+def report_status(report_id):
+    """Change one report's status - JSON body {"status": ...}"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    # JSON only: a cross-site HTML form can't send it, so the session cookie alone can't change state
+    if not request.is_json:
+        return jsonify({'error': 'Content-Type must be application/json'}), 415
+    
+    data = request.get_json(silent=True) or {}
+    success, message = update_report_status(report_id, data.get('status'), actor_id=session['user_id'])
+    
+    if not success:
+        return jsonify({'error': message}), 404 if message == 'Report not found' else 400
+    return jsonify({'id': report_id, 'status': data.get('status'), 'message': message})
+
+
+@bp.route('/api/reports/status', methods=['POST'])
+def report_status_batch():
+    """Change the status of many reports at once - JSON body {"ids": [...], "status": ...}"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    if not request.is_json:
+        return jsonify({'error': 'Content-Type must be application/json'}), 415
+    
+    data = request.get_json(silent=True) or {}
+    report_ids = data.get('ids')
+    if not isinstance(report_ids, list):
+        return jsonify({'error': 'ids must be a list of report IDs'}), 400
+    
+    success, message, updated_ids, missing_ids = update_report_statuses(
+        report_ids, data.get('status'), actor_id=session['user_id']
+    )
+    
+    if not success:
+        return jsonify({'error': message}), 400
+    return jsonify({'status': data.get('status'), 'updated': updated_ids, 'not_found': missing_ids})
+
+
+@bp.route('/api/reports/status-history')
+def report_status_history():
+    """
+    Status transitions since a point in time (JSON)
+    
+    Query parameters: since (ISO timestamp), after (last history id seen),
+    report_id and limit. Follow up with after=last_id until entries is empty.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    entries = get_status_history(
+        since=parse_timestamp_arg(request.args.get('since')),
+        after_id=request.args.get('after', type=int),
+        report_id=request.args.get('report_id', type=int),
+        limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    )
+    
+    return jsonify({
+        'entries': entries,
+        'last_id': entries[-1]['id'] if entries else request.args.get('after', type=int)
+    })
+
+@bp.route('/logout')
 def logout():
     """Logout user"""
+    # Drop the server-side session; the flash message below goes in a new one
     session.clear()
+    session.regenerate()
     flash('Logged out successfully', 'success')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
 
-@app.route('/about')
+@bp.route('/about')
 def about():
     """About page - information about WasteSnap"""
     return render_template('about.html')
 
 
+@bp.before_request
+def load_current_user():
+    """
+    Resolve the signed-in user into g.user before every view
+    
+    Sessions of accounts that no longer exist are ended, so every
+    'user_id' in session check below means a live user.
+    """
+    g.user = None
+    if 'user_id' not in session:
+        return
+    
+    try:
+        g.user = get_user_by_id(session['user_id'])
+    except sqlite3.Error as e:
+        # A failed lookup (e.g. a locked database) is not a deleted account - keep the session
+        print(f"Could not load user {session['user_id']}: {e}")
+        return
+    
+    if g.user is None:
+        session.clear()
+    elif (session.get('user_name'), session.get('user_email')) != (g.user['name'], g.user['email']):
+        session['user_name'] = g.user['name']
+        session['user_email'] = g.user['email']
+
+
 # ============================================
 # ERROR HANDLERS
 # ============================================
 
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def page_not_found(e):
     """404 error handler"""
     return render_template('404.html'), 404
 
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_server_error(e):
     """500 error handler"""
     return render_template('500.html'), 500
 
 
+# ============================================
+# CLI COMMANDS
+# ============================================
+
+@bp.cli.command('import-reports')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--photo-dir', type=click.Path(exists=True, file_okay=False),
+              help='Directory that photo fields are relative to.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Reports committed per transaction.')
+@click.option('--user-id', type=int, help='Reporter ID for records without a user_id.')
+def import_reports_command(path, photo_dir, batch_size, user_id):
+    """Bulk import reports from a CSV or JSONL file."""
+    def progress(stats):
+        rate = stats['imported'] / stats['seconds'] if stats['seconds'] else 0
+        click.echo(f"  {stats['imported']} imported, {stats['rejected']} rejected ({rate:.0f} reports/s)")
+    
+    stats = import_reports(path, current_app.config['UPLOAD_FOLDER'], photo_dir=photo_dir,
+                           batch_size=batch_size, default_user_id=user_id, on_batch=progress)
+    
+    for line_number, error in stats['errors'][:20]:
+        click.echo(f"  line {line_number}: {error}", err=True)
+    if len(stats['errors']) > 20:
+        click.echo(f"  ... and {len(stats['errors']) - 20} more errors", err=True)
+    
+    rate = stats['imported'] / stats['seconds'] if stats['seconds'] else 0
+    click.echo(f"Imported {stats['imported']} reports, rejected {stats['rejected']} "
+               f"in {stats['seconds']:.1f}s ({rate:.0f} reports/s)")
+
+@bp.cli.command('export-reports')
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@click.option('--format', 'export_format', type=click.Choice(EXPORT_FORMATS),
+              help='Output format (default: parquet if pyarrow is installed, else gzip csv).')
+@click.option('--since-id', default=0, show_default=True,
+              help='Only export reports with a higher ID (the last_id of a previous export).')
+@click.option('--waste-type', help='Only this waste type.')
+@click.option('--severity', help='Only this severity.')
+@click.option('--status', help='Only this status.')
+@click.option('--from', 'date_from', help='Only reports created on or after YYYY-MM-DD.')
+@click.option('--to', 'date_to', help='Only reports created on or before YYYY-MM-DD.')
+def export_reports_command(output, export_format, since_id, waste_type, severity, status, date_from, date_to):
+    """Export reports to a Parquet or gzip CSV file."""
+    export_format = export_format or default_format()
+    if export_format not in available_formats():
+        raise click.UsageError("Parquet export requires the 'pyarrow' package")
+    
+    filters = get_report_filters({'waste_type': waste_type, 'severity': severity, 'status': status,
+                                  'from': date_from, 'to': date_to})
+    stats = export_reports(output, export_format, since_id, **filters)
+    
+    click.echo(f"Exported {stats['rows']} reports to {output} ({export_format}); "
+               f"last_id={stats['last_id']}")
+
+@bp.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recompute the summary statistics from all reports."""
+    success, message = rebuild_report_stats()
+    click.echo(message, err=not success)
+    if not success:
+        raise SystemExit(1)
+
+@bp.cli.command('rebuild-clusters')
+def rebuild_clusters_command():
+    """Recompute the map cluster aggregates from all reports."""
+    success, message = rebuild_report_clusters()
+    click.echo(message, err=not success)
+    if not success:
+        raise SystemExit(1)
+
+@bp.cli.command('geocode-reports')
+@click.option('--gazetteer', type=click.Path(exists=True, dir_okay=False),
+              help='Gazetteer CSV (default: the GAZETTEER_PATH setting).')
+@click.option('--batch-size', default=1000, show_default=True,
+              help='Reports updated per transaction.')
+def geocode_reports_command(gazetteer, batch_size):
+    """Fill in readable_area for reports that have none from the offline gazetteer."""
+    if gazetteer:
+        configure_geocoder(gazetteer)
+    elif not current_app.config['GAZETTEER_PATH']:
+        raise click.UsageError('Pass --gazetteer or set GAZETTEER_PATH')
+    
+    def progress(examined, updated):
+        click.echo(f"  {examined} examined, {updated} updated")
+    
+    success, message, _ = fill_missing_areas(reverse_geocode, batch_size, on_batch=progress)
+    click.echo(message, err=not success)
+    if not success:
+        raise SystemExit(1)
+
+@bp.cli.command('create-photo-variants')
+def create_photo_variants_command():
+    """Create the web and thumbnail photos of reports that have none (e.g. from before variants)."""
+    created = failed = 0
+    for report_id, photo_path in iter_reports_without_variants():
+        if process_report_photo(report_id, photo_path, current_app.config['UPLOAD_FOLDER']):
+            created += 1
+        else:
+            failed += 1
+    click.echo(f"Created variants for {created} reports, {failed} failed")
+    if failed:
+        raise SystemExit(1)
+
+@bp.cli.command('build-assets')
+@click.option('--clean', is_flag=True, help='Remove earlier build output first.')
+def build_assets_command(clean):
+    """Fingerprint and precompress static assets into static/dist."""
+    manifest = assets.build_assets(current_app.static_folder, clean=clean)
+    click.echo(f"Built {len(manifest)} assets into {os.path.join(current_app.static_folder, assets.DIST_FOLDER)}; "
+               "restart the workers to serve them")
+
+@bp.cli.command('revoke-sessions')
+@click.argument('user_id', type=int)
+def revoke_sessions_command(user_id):
+    """Sign a user out on every device."""
+    revoked = revoke_user_sessions(user_id)
+    click.echo(f"Revoked {revoked} sessions of user {user_id}")
+
+
+# ============================================
+# APPLICATION FACTORY
+# ============================================
+
+def default_config():
+    """
+    Settings used unless create_app() is given others
+    
+    Deployment settings can also be set with environment variables of the
+    same name.
+    
+    Returns:
+        dict: Flask config values
+    """
+    return {
+        # Secret key for session management (set SECRET_KEY in production!)
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production'),
+        
+        # Where sessions are kept: 'sqlite' (auth.db, shared by all workers) or
+        # 'memory' (single process only); the cookie holds just a session ID
+        'SESSION_STORE': os.environ.get('SESSION_STORE', 'sqlite'),
+        
+        # Reverse proxies in front of the app (e.g. 1 for nginx). Their
+        # X-Forwarded-For/-Proto/-Host headers are trusted that many hops deep,
+        # so sign-in throttling sees client addresses, not the proxy's.
+        # Leave at 0 when clients connect directly - the headers are spoofable.
+        'PROXY_FIX_X_FOR': int(os.environ.get('PROXY_FIX_X_FOR', 0)),
+        
+        # Database files and the photo upload store
+        'AUTH_DB_PATH': os.environ.get('AUTH_DB_PATH', 'auth.db'),
+        'REPORTS_DB_PATH': os.environ.get('REPORTS_DB_PATH', 'reports.db'),
+        'UPLOAD_FOLDER': os.environ.get('UPLOAD_FOLDER', UPLOAD_FOLDER),
+        'MAX_CONTENT_LENGTH': 16 * 1024 * 1024,  # 16MB max file size
+        
+        # Stream listing pages to the client while their rows are still being read
+        'STREAM_TEMPLATES': True,
+        
+        # Optional shared cache for multi-worker deployments, e.g. 'redis://localhost:6379/0'
+        'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL'),
+        
+        # Offline reverse geocoding fills in missing areas - a CSV of named places
+        # (see geocoder.py), loaded on first use
+        'GAZETTEER_PATH': os.environ.get('GAZETTEER_PATH'),
+        
+        # Request/query/upload timings at /metrics - set METRICS_ENABLED=0 to switch off
+        'METRICS_ENABLED': os.environ.get('METRICS_ENABLED', '1') != '0',
+        
+        # Link static files by their fingerprinted names once 'flask build-assets' has run
+        'ASSET_FINGERPRINTS': True,
+        
+        # Bring both schemas up to date, then pay first-request costs, at startup
+        'INIT_SCHEMA': True,
+        'WARMUP': os.environ.get('WARMUP', '1') != '0',
+    }
+
+def warmup(app):
+    """
+    Pay first-request costs while the worker starts instead of on a user's request
+    
+    Compiles every template, builds the URL map and loads the gazetteer if
+    one is configured - state shared by all of the worker's threads.
+    Database connections are per thread and gthread workers serve requests
+    on threads of their own, so those are opened on each thread's first
+    request rather than here.
+    
+    Args:
+        app: The application being created
+    """
+    start = time.perf_counter()
+    
+    for name in app.jinja_env.list_templates(filter_func=lambda name: name.endswith('.html')):
+        app.jinja_env.get_template(name)
+    app.url_map.update()
+    get_gazetteer()
+    
+    print(f"Worker {os.getpid()} warmed up in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+def create_app(config=None):
+    """
+    Create and configure the WasteWatch application
+    
+    Called once per worker process (see wsgi.py). Schema migrations are
+    idempotent and serialized between processes (see db.run_migrations),
+    so workers starting together apply each one exactly once.
+    
+    Args:
+        config: Optional mapping of settings overriding default_config()
+    
+    Returns:
+        Flask: The configured application
+    """
+    app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.config.update(default_config())
+    if config:
+        app.config.update(config)
+    
+    proxies = app.config['PROXY_FIX_X_FOR']
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+    
+    # Database paths and the cache/geocoder backends are process-wide
+    auth.DB_PATH = app.config['AUTH_DB_PATH']
+    reports_db.DB_PATH = app.config['REPORTS_DB_PATH']
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    
+    if app.config['CACHE_REDIS_URL']:
+        configure_cache(RedisCache(app.config['CACHE_REDIS_URL']))
+    configure_geocoder(app.config['GAZETTEER_PATH'])
+    configure_sessions(app)
+    
+    # Reuse per-thread database connections across requests
+    db.init_app(app)
+    metrics.init_app(app)
+    assets.init_app(app)
+    app.register_blueprint(bp)
+    
+    if app.config['INIT_SCHEMA']:
+        init_db()
+        init_reports_db()
+    if app.config['WARMUP']:
+        warmup(app)
+    
+    return app
+
+
 # ============================================
 # MAIN
 # ============================================
 
 if __name__ == '__main__':
-    init_db()  # Initialize auth database
-    init_reports_db()  # Initialize reports database
-    # Run the Flask app
+    # Development server only - see wsgi.py for production serving
     # Debug mode is ON - turn OFF in production!
-    app.run(debug=True, host='0.0.0.0')
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+============================================
+WASTEWATCH - ASSETS.PY
+Fingerprinted, precompressed static assets and HTTP caching headers
+============================================
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import Response, request, send_from_directory
+from werkzeug.security import safe_join
+
+from images import is_photo_variant
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - assets are then precompressed with gzip only
+    brotli = None
+
+# Build output, inside the static folder so it is served under /static/dist/
+DIST_FOLDER = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Source folders that are not build inputs
+SKIP_FOLDERS = {DIST_FOLDER, 'uploads'}
+
+# Text assets worth compressing; images and video already are
+COMPRESS_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.map'}
+MIN_COMPRESS_SIZE = 256  # bytes
+
+# Content-Encoding -> file suffix, most preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Fingerprinted files never change, so clients may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Uploaded photos are served from the UPLOAD_FOLDER setting under this path
+UPLOAD_URL_PATH = '/uploads'
+
+# Uploads are content-addressed but served without a fingerprint; cache
+# for a day, then revalidate with a conditional GET
+UPLOAD_MAX_AGE = 24 * 3600
+
+def fingerprint(data, length=10):
+    """Short content hash used in built file names"""
+    return hashlib.sha256(data).hexdigest()[:length]
+
+def _compressed_variants(data):
+    """Precompressed bodies per encoding suffix, kept only when they are smaller"""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data)}
+
+def build_assets(static_folder, clean=False):
+    """
+    Fingerprint and precompress the static assets
+    
+    Every file outside SKIP_FOLDERS is copied to dist/ with a content hash
+    in its name (css/index.css -> dist/css/index.<hash>.css), text assets
+    get .gz (and, with the brotli package, .br) siblings, and a manifest
+    maps source names to built ones. Files from earlier builds are kept
+    unless clean is set, so pages cached before a deploy still load.
+    
+    Args:
+        static_folder: The app's static folder
+        clean: Remove earlier build output first
+    
+    Returns:
+        dict: The manifest, {source name: built name} relative to static_folder
+    """
+    dist = os.path.join(static_folder, DIST_FOLDER)
+    if clean and os.path.isdir(dist):
+        shutil.rmtree(dist)
+    
+    manifest = {}
+    for root, folders, files in os.walk(static_folder):
+        if root == static_folder:
+            folders[:] = [folder for folder in folders if folder not in SKIP_FOLDERS]
+        
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            
+            stem, extension = os.path.splitext(relative)
+            built = f"{DIST_FOLDER}/{stem}.{fingerprint(data)}{extension}"
+            target = os.path.join(static_folder, *built.split('/'))
+            manifest[relative] = built
+            if os.path.exists(target):
+                continue  # unchanged since an earlier build
+            
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if extension.lower() in COMPRESS_EXTENSIONS and len(data) >= MIN_COMPRESS_SIZE:
+                for suffix, body in _compressed_variants(data).items():
+                    with open(target + suffix, 'wb') as f:
+                        f.write(body)
+            shutil.copyfile(source, target)  # last, so a complete target means a complete build
+    
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+def load_manifest(static_folder):
+    """
+    Read the manifest written by build_assets
+    
+    Returns:
+        dict: {source name: built name}, empty if assets haven't been built
+    """
+    try:
+        with open(os.path.join(static_folder, DIST_FOLDER, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def init_app(app):
+    """
+    Serve built assets and uploaded photos with caching headers
+    
+    url_for('static', filename=...) emits the fingerprinted name of any
+    built asset, served with immutable caching and, when the client
+    accepts it, a precompressed body. Anything not in the manifest (e.g.
+    before the first build) is served from its source file as usual.
+    url_for('uploaded_photo', filename=...) links a photo variant by its
+    path in the upload store; original uploads are not served. Range
+    requests and conditional GETs are handled by send_from_directory.
+    """
+    manifest = load_manifest(app.static_folder) if app.config.get('ASSET_FINGERPRINTS', True) else {}
+    dist = os.path.join(app.static_folder, DIST_FOLDER)
+    
+    @app.url_defaults
+    def fingerprinted_static(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifest.get(values['filename'], values['filename'])
+    
+    # More specific than /static/<path:filename>, so it takes precedence for built files
+    @app.route(f'{app.static_url_path}/{DIST_FOLDER}/<path:filename>')
+    def dist_asset(filename):
+        """A built asset, precompressed when the client accepts it"""
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        
+        for encoding, suffix in ENCODINGS:
+            path = safe_join(dist, filename + suffix)
+            if request.accept_encodings[encoding] and path and os.path.isfile(path):
+                response = send_from_directory(dist, filename + suffix, mimetype=mimetype,
+                                               max_age=IMMUTABLE_MAX_AGE)
+                response.content_encoding = encoding
+                break
+        else:
+            response = send_from_directory(dist, filename, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+        
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+        return response
+    
+    @app.route(f'{UPLOAD_URL_PATH}/<path:filename>')
+    def uploaded_photo(filename):
+        """A photo variant from the upload store, relative to UPLOAD_FOLDER"""
+        # Originals keep their EXIF (GPS, device) metadata and are never served
+        if not is_photo_variant(filename):
+            return Response('Not found\n', status=404, mimetype='text/plain')
+        
+        # Stored paths are relative to the working directory, like the database paths
+        response = send_from_directory(os.path.abspath(app.config['UPLOAD_FOLDER']), filename,
+                                       max_age=UPLOAD_MAX_AGE)
+        response.cache_control.public = True
+        return response
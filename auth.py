@@ -7,25 +7,47 @@ Authentication module with SQLite database
 
 import sqlite3
 import hashlib
+import hmac
 import os
+import threading
+import time
 from datetime import datetime
+from werkzeug.security import generate_password_hash, check_password_hash
+from db import get_connection, run_migrations
+from metrics import timed
+from cache import LRUCache, record
 
 # Database file path
 DB_PATH = 'auth.db'
 
+# Password KDF in werkzeug method syntax, e.g. 'scrypt:32768:8:1' or
+# 'pbkdf2:sha256:600000'. Hashes made with any other setting (including
+# legacy unsalted SHA-256) are upgraded on the user's next sign in.
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+PASSWORD_SALT_LENGTH = 16
+
+# Sign-in throttling: failures per IP and per email within a window
+IP_ATTEMPT_LIMIT = 20
+IP_ATTEMPT_WINDOW = 60  # seconds
+EMAIL_FAILURE_LIMIT = 5
+EMAIL_FAILURE_WINDOW = 15 * 60  # seconds
+THROTTLE_MESSAGE = "Too many sign-in attempts. Please try again later."
+
+# In-process cache of users by ID. The TTL bounds how long another worker
+# process may serve a user changed elsewhere; this process invalidates its
+# own entries on every change.
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL = 60  # seconds
+
 def get_db_connection():
-    """Create and return a database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Return this thread's shared connection to the database"""
+    return get_connection(DB_PATH)
 
-def init_db():
-    """Initialize the database and create users table if it doesn't exist"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Create users table
-    cursor.execute('''
+# Schema history for auth.db, applied in order by init_db.
+# Never edit a released migration - append a new one instead.
+MIGRATIONS = [
+    (1, 'create users table', [
+        '''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
@@ -34,16 +56,122 @@ def init_db():
             password TEXT NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-    ''')
-    
-    conn.commit()
-    conn.close()
+        ''',
+    ]),
+    (2, 'create sessions table', [
+        '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            key TEXT PRIMARY KEY,  -- SHA-256 of the session ID in the cookie
+            user_id INTEGER,
+            data TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)',
+    ]),
+]
+
+def init_db():
+    """Initialize the database and bring its schema up to date"""
+    conn = get_db_connection()
+    run_migrations(conn, MIGRATIONS)
     print(f"Database initialized: {DB_PATH}")
 
+class AttemptLimiter:
+    """
+    In-memory fixed-window attempt counter keyed by email or IP
+    
+    Entries expire with their window. The table is bounded by max_keys;
+    expired entries are purged first, then the oldest ones.
+    """
+    
+    def __init__(self, max_attempts, window_seconds, max_keys=100000):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._entries = {}  # key -> [count, window_expires_at]
+        self._lock = threading.Lock()
+    
+    def is_blocked(self, key):
+        """Return True if key has used up its attempts in the current window"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return bool(entry) and entry[1] > time.monotonic() and entry[0] >= self.max_attempts
+    
+    def hit(self, key):
+        """Record one attempt for key"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                self._entries.pop(key, None)
+                self._entries[key] = [1, now + self.window_seconds]
+                if len(self._entries) > self.max_keys:
+                    self._purge(now)
+            else:
+                entry[0] += 1
+    
+    def reset(self, key):
+        """Forget all attempts for key"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def _purge(self, now):
+        """Drop expired entries, then the oldest ones, until under max_keys"""
+        for key in [key for key, entry in self._entries.items() if entry[1] <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_keys:
+            del self._entries[next(iter(self._entries))]
+
+_ip_limiter = AttemptLimiter(IP_ATTEMPT_LIMIT, IP_ATTEMPT_WINDOW)
+_email_limiter = AttemptLimiter(EMAIL_FAILURE_LIMIT, EMAIL_FAILURE_WINDOW)
+
 def hash_password(password):
-    """Hash a password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password with a salted slow KDF (PASSWORD_HASH_METHOD)"""
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD, salt_length=PASSWORD_SALT_LENGTH)
+
+def _is_legacy_hash(stored_hash):
+    """Unsalted SHA-256 hex digests from before the KDF migration"""
+    return '$' not in stored_hash and len(stored_hash) == 64
+
+def verify_password(stored_hash, password):
+    """
+    Check a password against a stored hash of any supported format
+    
+    Args:
+        stored_hash: Value of users.password
+        password: Password to check
+    
+    Returns:
+        bool: True if the password matches
+    """
+    if _is_legacy_hash(stored_hash):
+        legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy_hash, stored_hash)
+    return check_password_hash(stored_hash, password)
+
+def password_needs_rehash(stored_hash):
+    """Return True if a stored hash was not made with the current KDF settings"""
+    return _is_legacy_hash(stored_hash) or not stored_hash.startswith(PASSWORD_HASH_METHOD + '$')
+
+_user_cache = LRUCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+_MISSING = object()
+
+def invalidate_user(user_id):
+    """Drop a user from this process's cache - call after any change to their account"""
+    _user_cache.delete(user_id)
 
+_dummy_hash = None
+
+def _burn_password_check(password):
+    """Spend one KDF verification so unknown emails take as long as wrong passwords"""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(os.urandom(16).hex())
+    check_password_hash(_dummy_hash, password)
+
+@timed
 def signup(name, number, email, password):
     """
     Register a new user
@@ -78,7 +206,6 @@ def signup(name, number, email, password):
         existing_user = cursor.fetchone()
         
         if existing_user:
-            conn.close()
             return False, "Email already registered. Please sign in instead.", None
         
         # Hash the password
@@ -92,21 +219,30 @@ def signup(name, number, email, password):
         
         user_id = cursor.lastrowid
         conn.commit()
-        conn.close()
+        invalidate_user(user_id)  # in case the ID was looked up (and cached as missing) before
         
         return True, "Account created successfully!", user_id
     
     except sqlite3.Error as e:
-        conn.close()
+        conn.rollback()
         return False, f"Database error: {str(e)}", None
 
-def signin(email, password):
+@timed
+def signin(email, password, ip_address=None):
     """
     Authenticate a user
     
+    Failed attempts are throttled per IP address and per email before any
+    password hashing is done; successful sign ins don't count, so users
+    behind a shared address aren't locked out by each other. Legacy or
+    outdated password hashes are replaced with the current KDF on
+    successful sign in.
+    
     Args:
         email: User's email address
         password: User's password
+        ip_address: Optional client IP address for throttling (the real
+            client address - see PROXY_FIX_X_FOR in app.py)
     
     Returns:
         tuple: (success: bool, message: str, user_data: dict or None)
@@ -115,49 +251,88 @@ def signin(email, password):
     if not email or not password:
         return False, "Email and password are required", None
     
+    email_key = email.strip().lower()
+    if (ip_address and _ip_limiter.is_blocked(ip_address)) or _email_limiter.is_blocked(email_key):
+        return False, THROTTLE_MESSAGE, None
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        # Hash the provided password
-        hashed_password = hash_password(password)
-        
-        # Check if user exists and password matches
+        # Look up the user, then verify the password against its stored hash
         cursor.execute('''
-            SELECT id, name, number, email, created_at
+            SELECT id, name, number, email, password, created_at
             FROM users
-            WHERE email = ? AND password = ?
-        ''', (email, hashed_password))
+            WHERE email = ?
+        ''', (email,))
         
         user = cursor.fetchone()
-        conn.close()
         
-        if user:
-            user_data = {
-                'id': user['id'],
-                'name': user['name'],
-                'number': user['number'],
-                'email': user['email'],
-                'created_at': user['created_at']
-            }
-            return True, "Logged in successfully!", user_data
-        else:
+        if user is None:
+            _burn_password_check(password)
+        
+        if user is None or not verify_password(user['password'], password):
+            _email_limiter.hit(email_key)
+            if ip_address:
+                _ip_limiter.hit(ip_address)
             return False, "Invalid email or password", None
+        
+        _email_limiter.reset(email_key)
+        
+        # Transparently upgrade legacy / outdated hashes
+        if password_needs_rehash(user['password']):
+            cursor.execute('''
+                UPDATE users
+                SET password = ?
+                WHERE id = ?
+            ''', (hash_password(password), user['id']))
+            conn.commit()
+        
+        user_data = {
+            'id': user['id'],
+            'name': user['name'],
+            'number': user['number'],
+            'email': user['email'],
+            'created_at': user['created_at']
+        }
+        return True, "Logged in successfully!", user_data
     
     except sqlite3.Error as e:
-        conn.close()
+        conn.rollback()
         return False, f"Database error: {str(e)}", None
 
 def get_user_by_id(user_id):
     """
     Get user information by ID
     
+    Served from an in-process cache (misses included), so resolving the
+    signed-in user on every request costs a dictionary lookup. Entries
+    are dropped by invalidate_user and expire after USER_CACHE_TTL. The
+    returned dict is shared - don't modify it.
+    
     Args:
         user_id: User's ID
     
     Returns:
-        dict or None: User data if found, None otherwise
+        dict or None: User data if found, None if there is no such user
+    
+    Raises:
+        sqlite3.Error: If the user couldn't be read (not cached), so callers
+            can tell a missing account from a failed lookup
     """
+    user = _user_cache.get(user_id, _MISSING)
+    if user is not _MISSING:
+        record('users', True)
+        return user
+    
+    record('users', False)
+    user = _load_user(user_id)
+    _user_cache.set(user_id, user)
+    return user
+
+@timed
+def _load_user(user_id):
+    """Read a user from the database, None if the row doesn't exist"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -169,19 +344,16 @@ def get_user_by_id(user_id):
         ''', (user_id,))
         
         user = cursor.fetchone()
-        conn.close()
-        
-        if user:
-            return {
-                'id': user['id'],
-                'name': user['name'],
-                'number': user['number'],
-                'email': user['email'],
-                'created_at': user['created_at']
-            }
-        return None
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     
-    except sqlite3.Error as e:
-        conn.close()
-        return None
-
+    if user:
+        return {
+            'id': user['id'],
+            'name': user['name'],
+            'number': user['number'],
+            'email': user['email'],
+            'created_at': user['created_at']
+        }
+    return None
@@ -0,0 +1,106 @@
+"""
+============================================
+WASTEWATCH - BENCH_INDEXES.PY
+Query plans and timings before/after the secondary index migration
+
+Usage (from the repository root):
+    python -m benchmarks.bench_indexes --reports 200000
+============================================
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import reports_db
+from db import run_migrations
+
+INDEX_MIGRATION = 5
+
+WASTE_TYPES = ['Plastic', 'Organic', 'Construction debris', 'E-waste', 'Mixed / Other']
+SEVERITIES = ['Low', 'Medium', 'High', None]
+STATUSES = ['Pending', 'In Progress', 'Cleaned']
+
+# Columns that exist before INDEX_MIGRATION - later migrations add to
+# reports_db.REPORT_COLUMNS, which the 'before' schema doesn't have
+COLUMNS = 'id, user_id, waste_type, severity, report_status, created_at'
+
+QUERIES = {
+    'dashboard (reports by user)': (
+        f'SELECT {COLUMNS} FROM reports WHERE user_id = ? ORDER BY created_at DESC',
+        lambda rng, users: (rng.randint(1, users),)
+    ),
+    'pending reports, newest first': (
+        f"SELECT {COLUMNS} FROM reports WHERE report_status = ? "
+        f"ORDER BY created_at DESC LIMIT 24",
+        lambda rng, users: ('Pending',)
+    ),
+    'count by waste type and severity': (
+        'SELECT COUNT(*) FROM reports WHERE waste_type = ? AND severity = ?',
+        lambda rng, users: (rng.choice(WASTE_TYPES), rng.choice(SEVERITIES[:3]))
+    ),
+}
+
+def seed(conn, count, users, rng):
+    """Insert count synthetic reports"""
+    rows = []
+    for i in range(count):
+        rows.append((
+            rng.randint(1, users), f"user{i % users}",
+            19.0 + rng.random() * 0.3, 72.8 + rng.random() * 0.2,
+            'bench.jpg', rng.choice(WASTE_TYPES), rng.choice(SEVERITIES),
+            rng.choice(STATUSES), f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00"
+        ))
+    conn.executemany('''
+        INSERT INTO reports (user_id, username, latitude, longitude, photo_path,
+                             waste_type, severity, report_status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+
+def measure(conn, users, runs, rng):
+    """Print the plan and mean latency of each benchmark query"""
+    for name, (sql, make_params) in QUERIES.items():
+        params = make_params(rng, users)
+        plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+        
+        start = time.perf_counter()
+        for _ in range(runs):
+            conn.execute(sql, make_params(rng, users)).fetchall()
+        elapsed_ms = (time.perf_counter() - start) / runs * 1000
+        
+        print(f"  {name}: {elapsed_ms:.2f} ms")
+        for step in plan:
+            print(f"      {step}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=100000, help='number of synthetic reports')
+    parser.add_argument('--users', type=int, default=2000, help='number of distinct reporters')
+    parser.add_argument('--runs', type=int, default=50, help='executions per query')
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'bench_reports.db'))
+        
+        run_migrations(conn, [m for m in reports_db.MIGRATIONS if m[0] < INDEX_MIGRATION])
+        seed(conn, args.reports, args.users, rng)
+        
+        print(f"Before migration {INDEX_MIGRATION} ({args.reports} reports):")
+        measure(conn, args.users, args.runs, rng)
+        
+        run_migrations(conn, reports_db.MIGRATIONS)
+        conn.execute('ANALYZE')
+        
+        print(f"After migration {INDEX_MIGRATION}:")
+        measure(conn, args.users, args.runs, rng)
+        
+        conn.close()
+
+if __name__ == '__main__':
+    main()
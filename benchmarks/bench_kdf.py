@@ -0,0 +1,75 @@
+"""
+============================================
+WASTEWATCH - BENCH_KDF.PY
+Sign-ins per second at each password KDF cost setting
+
+Usage (from the repository root):
+    python -m benchmarks.bench_kdf --signins 20 --threads 4
+============================================
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import auth
+
+METHODS = [
+    'legacy sha256',
+    'pbkdf2:sha256:100000',
+    'pbkdf2:sha256:600000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+]
+
+def signins_per_second(method, signins, threads):
+    """Create one user with the given hash method and time signins against it"""
+    email = f"bench-{method.replace(':', '-').replace(' ', '-')}@example.com"
+    password = 'correct horse battery staple'
+    
+    if method == 'legacy sha256':
+        auth.signup('Bench', '0000000000', email, password)
+        conn = auth.get_db_connection()
+        conn.execute('UPDATE users SET password = ? WHERE email = ?',
+                     (hashlib.sha256(password.encode()).hexdigest(), email))
+        conn.commit()
+        # Every signin would upgrade the hash - time the comparison alone
+        stored = conn.execute('SELECT password FROM users WHERE email = ?', (email,)).fetchone()[0]
+        check = lambda _: auth.verify_password(stored, password)
+    else:
+        auth.PASSWORD_HASH_METHOD = method
+        auth.signup('Bench', '0000000000', email, password)
+        check = lambda _: auth.signin(email, password)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(check, range(signins)))
+    elapsed = time.perf_counter() - start
+    
+    assert all(result is True or result[0] for result in results), f"signin failed for {method}"
+    return signins / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--signins', type=int, default=20, help='signins per setting')
+    parser.add_argument('--threads', type=int, default=1, help='concurrent signin threads')
+    args = parser.parse_args()
+    
+    default_method = auth.PASSWORD_HASH_METHOD
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        auth.DB_PATH = os.path.join(tmp, 'bench_auth.db')
+        auth.init_db()
+        
+        print(f"{'method':<24} signins/s ({args.threads} thread(s))")
+        for method in METHODS:
+            rate = signins_per_second(method, args.signins, args.threads)
+            marker = '  <- default' if method == default_method else ''
+            print(f"{method:<24} {rate:10.1f}{marker}")
+
+if __name__ == '__main__':
+    main()
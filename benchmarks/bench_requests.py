@@ -0,0 +1,252 @@
+"""
+============================================
+WASTEWATCH - BENCH_REQUESTS.PY
+Throughput and p50/p99 latency of the main request paths
+
+Seeds temporary auth/reports databases with synthetic users and reports
+clustered around a few cities, then drives /snap, /find-waste, /dashboard
+and /signin through Flask test clients from several threads. Results are
+printed (or written) as JSON so runs can be compared between commits.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_requests --reports 100000 --threads 4
+    python -m benchmarks.bench_requests --reports 1000000 --output before.json
+============================================
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+import auth
+import images
+import reports_db
+from app import create_app
+
+WASTE_TYPES = ['Plastic', 'Organic', 'Construction debris', 'E-waste', 'Mixed / Other']
+SEVERITIES = ['Low', 'Medium', 'High', None]
+STATUSES = ['Pending', 'Pending', 'In Progress', 'Cleaned']
+
+# (latitude, longitude, spread in degrees, share of reports)
+CITIES = [
+    (19.0760, 72.8777, 0.08, 0.35),  # Mumbai
+    (18.5204, 73.8567, 0.06, 0.25),  # Pune
+    (28.6139, 77.2090, 0.10, 0.20),  # Delhi
+    (12.9716, 77.5946, 0.07, 0.20),  # Bengaluru
+]
+
+PASSWORD = 'benchmark-password'
+SCENARIOS = ['snap', 'find-waste', 'dashboard', 'signin']
+
+def random_location(rng):
+    """A point scattered around one of CITIES, weighted by its share"""
+    latitude, longitude, spread, _ = rng.choices(CITIES, weights=[city[3] for city in CITIES])[0]
+    return rng.gauss(latitude, spread), rng.gauss(longitude, spread)
+
+def seed_users(count):
+    """Insert count users sharing one real password hash"""
+    password_hash = auth.hash_password(PASSWORD)
+    conn = auth.get_db_connection()
+    conn.executemany(
+        'INSERT INTO users (name, number, email, password) VALUES (?, ?, ?, ?)',
+        [(f"User {i}", '9000000000', f"user{i}@example.com", password_hash) for i in range(1, count + 1)]
+    )
+    conn.commit()
+
+def seed_reports(count, users, rng, batch_size=50000):
+    """Insert count reports spread over the last year, then rebuild the map clusters"""
+    conn = reports_db.get_db_connection()
+    now = datetime.utcnow()
+    
+    for start in range(0, count, batch_size):
+        rows = []
+        for _ in range(min(batch_size, count - start)):
+            user_id = rng.randint(1, users)
+            latitude, longitude = random_location(rng)
+            created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+            rows.append((
+                user_id, f"User {user_id}", latitude, longitude, f"Ward {rng.randint(1, 200)}",
+                'bench.jpg', rng.choice(WASTE_TYPES), 'Synthetic benchmark report',
+                rng.choice(SEVERITIES), rng.choice(STATUSES), created_at.strftime('%Y-%m-%d %H:%M:%S')
+            ))
+        conn.executemany('''
+            INSERT INTO reports (user_id, username, latitude, longitude, readable_area, photo_path,
+                                 waste_type, description, severity, report_status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+    
+    reports_db.rebuild_report_clusters()
+    conn.execute('ANALYZE')
+
+def synthetic_jpeg(rng, size=640):
+    """A small noisy JPEG, different on every call so uploads aren't deduplicated"""
+    image = Image.effect_noise((size, size), rng.randint(20, 80)).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=80)
+    return buffer.getvalue()
+
+class Driver:
+    """Issues one scenario's requests from a thread-local, logged-in test client"""
+    
+    def __init__(self, app, users, seed):
+        self.app = app
+        self.users = users
+        self.seed = seed
+        self._local = threading.local()
+    
+    def _state(self):
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            rng = random.Random(f"{self.seed}-{threading.get_ident()}")
+            client = self.app.test_client()
+            user_id = rng.randint(1, self.users)
+            with client.session_transaction() as session:
+                session['user_id'] = user_id
+                session['user_name'] = f"User {user_id}"
+            state = self._local.state = (client, rng)
+        return state
+    
+    def request(self, scenario, index):
+        """Run one request, returning (seconds, ok)"""
+        client, rng = self._state()
+        
+        if scenario == 'snap':
+            latitude, longitude = random_location(rng)
+            photo = synthetic_jpeg(rng)
+            start = time.perf_counter()
+            response = client.post('/snap', data={
+                'latitude': f"{latitude:.6f}", 'longitude': f"{longitude:.6f}",
+                'waste_type': rng.choice(WASTE_TYPES), 'severity': 'Medium',
+                'photo': (io.BytesIO(photo), 'bench.jpg')
+            }, content_type='multipart/form-data')
+            expected = 302
+        elif scenario == 'find-waste':
+            choice = rng.random()
+            if choice < 0.5:
+                query = {}
+            elif choice < 0.75:
+                query = {'waste_type': rng.choice(WASTE_TYPES), 'status': 'Pending'}
+            else:
+                latitude, longitude = random_location(rng)
+                query = {'near': f"{latitude:.6f},{longitude:.6f}", 'radius': 1000}
+            start = time.perf_counter()
+            response = client.get('/find-waste', query_string=query)
+            expected = 200
+        elif scenario == 'dashboard':
+            start = time.perf_counter()
+            response = client.get('/dashboard')
+            expected = 200
+        else:
+            email = f"user{rng.randint(1, self.users)}@example.com"
+            start = time.perf_counter()
+            # A distinct client address per request keeps the per-IP throttle out of the way
+            response = client.post('/signin', data={'email': email, 'password': PASSWORD},
+                                   environ_base={'REMOTE_ADDR': f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"})
+            expected = 302
+        
+        response.get_data()  # include streamed bodies
+        elapsed = time.perf_counter() - start
+        response.close()
+        return elapsed, response.status_code == expected
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def run_scenario(driver, scenario, requests, threads):
+    """Drive requests of one scenario across threads and summarise the latencies"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda index: driver.request(scenario, index), range(requests)))
+    wall = time.perf_counter() - start
+    
+    latencies = sorted(elapsed for elapsed, _ in results)
+    return {
+        'requests': requests,
+        'errors': sum(1 for _, ok in results if not ok),
+        'seconds': round(wall, 3),
+        'throughput_rps': round(requests / wall, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+def git_commit():
+    """Current commit of the working tree, if this is a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=10000, help='synthetic reports to seed (10k-1M)')
+    parser.add_argument('--users', type=int, default=1000, help='synthetic users to seed')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--threads', type=int, default=4, help='concurrent client threads')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated subset of ' + ', '.join(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+    
+    scenarios = [scenario for scenario in args.scenarios.split(',') if scenario]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'AUTH_DB_PATH': os.path.join(tmp, 'auth.db'),
+            'REPORTS_DB_PATH': os.path.join(tmp, 'reports.db'),
+            'UPLOAD_FOLDER': os.path.join(tmp, 'uploads'),
+        })
+        
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        seed_users(args.users)
+        seed_reports(args.reports, args.users, rng)
+        seed_seconds = time.perf_counter() - start
+        
+        driver = Driver(app, args.users, args.seed)
+        results = {scenario: run_scenario(driver, scenario, args.requests, args.threads)
+                   for scenario in scenarios}
+        
+        # Let background photo variants finish before their directory goes away
+        images._executor.shutdown(wait=True)
+    
+    output = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'config': {'reports': args.reports, 'users': args.users, 'requests': args.requests,
+                   'threads': args.threads, 'seed': args.seed},
+        'seed_seconds': round(seed_seconds, 1),
+        'results': results,
+    }
+    
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+============================================
+WASTEWATCH - BENCH_ROWS.PY
+Time and memory of materialising report rows: dict copies vs Report records
+
+Usage (from the repository root):
+    python -m benchmarks.bench_rows --reports 100000
+============================================
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import reports_db
+from db import run_migrations
+
+WASTE_TYPES = ['Plastic', 'Organic', 'Construction debris', 'E-waste', 'Mixed / Other']
+SEVERITIES = ['Low', 'Medium', 'High', None]
+
+SQL = f'SELECT {reports_db.REPORT_COLUMNS} FROM reports ORDER BY created_at DESC'
+
+def seed(conn, count, rng):
+    """Insert count synthetic reports"""
+    conn.executemany('''
+        INSERT INTO reports (user_id, username, latitude, longitude, readable_area, photo_path,
+                             waste_type, description, severity, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(
+        rng.randint(1, 2000), f"user{i % 2000}",
+        19.0 + rng.random() * 0.3, 72.8 + rng.random() * 0.2, 'Andheri West, Mumbai',
+        'bench.jpg', rng.choice(WASTE_TYPES), 'Overflowing bin near the bus stop',
+        rng.choice(SEVERITIES), f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00"
+    ) for i in range(count)])
+    conn.commit()
+
+def dict_rows(conn):
+    """The previous approach - sqlite3.Row copied into a dict per row"""
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute(SQL)
+    return [{field: row[field] for field in reports_db.REPORT_FIELDS} for row in cursor.fetchall()]
+
+def record_rows(conn):
+    """Report records built directly by the row factory"""
+    cursor = conn.cursor()
+    cursor.row_factory = reports_db._report_factory
+    cursor.execute(SQL)
+    return cursor.fetchall()
+
+def measure(fetch, conn, runs):
+    """Best wall time over runs, plus the memory held by one result list"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        fetch(conn)
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    rows = fetch(conn)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return best, held, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=100000, help='number of synthetic reports')
+    parser.add_argument('--runs', type=int, default=5, help='timed runs per approach')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'bench_reports.db'))
+        run_migrations(conn, reports_db.MIGRATIONS)
+        seed(conn, args.reports, random.Random(42))
+        
+        print(f"{args.reports} rows, {len(reports_db.REPORT_FIELDS)} columns")
+        print(f"{'approach':<16} {'time (ms)':>10} {'held (MB)':>10} {'peak (MB)':>10}")
+        for name, fetch in (('dict copy', dict_rows), ('Report records', record_rows)):
+            elapsed, held, peak = measure(fetch, conn, args.runs)
+            print(f"{name:<16} {elapsed * 1000:10.1f} {held / 2**20:10.1f} {peak / 2**20:10.1f}")
+        
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+============================================
+WASTEWATCH - BENCH_STARTUP.PY
+Worker startup time and first-request latency, with and without warmup
+
+Each run is a fresh interpreter, as a new worker process would be.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup --reports 100000 --runs 5
+============================================
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Timed inside each fresh worker process; prints one JSON line
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({'AUTH_DB_PATH': sys.argv[1], 'REPORTS_DB_PATH': sys.argv[2],
+                  'UPLOAD_FOLDER': sys.argv[3], 'WARMUP': sys.argv[4] == '1'})
+created = time.perf_counter()
+client = app.test_client()
+with client.session_transaction() as session:
+    session['user_id'] = 1
+    session['user_name'] = 'User 1'
+timings = []
+for _ in range(2):
+    request_start = time.perf_counter()
+    response = client.get('/find-waste')
+    response.get_data()
+    timings.append(time.perf_counter() - request_start)
+print(json.dumps({'import': imported - start, 'create_app': created - imported,
+                  'first_request': timings[0], 'second_request': timings[1]}))
+'''
+
+STAGES = ['import', 'create_app', 'first_request', 'second_request']
+
+def run_worker(paths, warmup):
+    """Start one fresh interpreter and return its timings in seconds"""
+    result = subprocess.run([sys.executable, '-c', CHILD, *paths, '1' if warmup else '0'],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=10000, help='synthetic reports to seed')
+    parser.add_argument('--runs', type=int, default=5, help='worker starts per mode')
+    args = parser.parse_args()
+    
+    # Imported here so the seeding process never times a cold import itself
+    from app import create_app
+    from benchmarks.bench_requests import seed_users, seed_reports
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = (os.path.join(tmp, 'auth.db'), os.path.join(tmp, 'reports.db'), os.path.join(tmp, 'uploads'))
+        
+        start = time.perf_counter()
+        create_app({'AUTH_DB_PATH': paths[0], 'REPORTS_DB_PATH': paths[1], 'UPLOAD_FOLDER': paths[2],
+                    'WARMUP': False})
+        migrate = time.perf_counter() - start
+        seed_users(100)
+        seed_reports(args.reports, 100, random.Random(42))
+        print(f"{args.reports} reports; fresh schema created in {migrate * 1000:.0f} ms")
+        
+        print(f"{'mode':<10}" + ''.join(f"{stage + ' (ms)':>20}" for stage in STAGES))
+        for mode, warmup in (('cold', False), ('warmup', True)):
+            runs = [run_worker(paths, warmup) for _ in range(args.runs)]
+            medians = [statistics.median(run[stage] for run in runs) * 1000 for stage in STAGES]
+            print(f"{mode:<10}" + ''.join(f"{median:>20.1f}" for median in medians))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+============================================
+WASTEWATCH - CACHE.PY
+Read-through caching for database queries
+============================================
+"""
+
+import functools
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # Redis is optional - the in-process cache needs nothing
+    redis = None
+
+DEFAULT_MAXSIZE = 2048
+DEFAULT_TTL = 30  # seconds; bounds staleness between processes with local caches
+
+_MISSING = object()
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+    
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def incr(self, key):
+        """Increment a counter that is never evicted (used for namespace generations)"""
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+    
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisCache:
+    """Cache backed by a Redis-compatible server, shared by all workers"""
+    
+    def __init__(self, url, ttl=DEFAULT_TTL, prefix='wastewatch:'):
+        if redis is None:
+            raise RuntimeError("RedisCache requires the 'redis' package")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+    
+    def get(self, key, default=None):
+        data = self.client.get(self.prefix + key)
+        return default if data is None else pickle.loads(data)
+    
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=self.ttl if ttl is None else ttl)
+    
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+    
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+    
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+    
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+_backend = LRUCache()
+_stats = {}  # namespace -> [hits, misses]
+_stats_lock = threading.Lock()
+_local = threading.local()  # .call: the _CachedCall whose function is running
+
+class _CachedCall:
+    """Per-call state of a cached function, so dont_cache() marks only the call it runs in"""
+    
+    skip = False
+
+def _run_in(call, func, *args, **kwargs):
+    """Run func with call as the current cached call, restoring the previous one after"""
+    outer = getattr(_local, 'call', None)
+    _local.call = call
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.call = outer
+
+def configure_cache(backend):
+    """Replace the cache backend (e.g. with a RedisCache)"""
+    global _backend
+    _backend = backend
+
+def get_cache():
+    """Return the active cache backend"""
+    return _backend
+
+def record(namespace, hit):
+    """Count a cache hit or miss for namespace"""
+    with _stats_lock:
+        counts = _stats.setdefault(namespace, [0, 0])
+        counts[0 if hit else 1] += 1
+
+def cache_stats():
+    """
+    Hit/miss counters per namespace for this process
+    
+    Returns:
+        dict: {namespace: {'hits': int, 'misses': int}}
+    """
+    with _stats_lock:
+        return {namespace: {'hits': hits, 'misses': misses} for namespace, (hits, misses) in _stats.items()}
+
+def dont_cache():
+    """Mark the result of the current cached call as not cacheable (e.g. after a DB error)"""
+    call = getattr(_local, 'call', None)
+    if call is not None:
+        call.skip = True
+
+def invalidate(namespace):
+    """Invalidate every cached entry in a namespace by bumping its generation"""
+    _backend.incr(f"gen:{namespace}")
+
+def _cache_key(namespace, func, args, kwargs):
+    """Entry key under the namespace's current generation"""
+    generation = _backend.counter(f"gen:{namespace}")
+    return f"{namespace}:{generation}:{func.__name__}:{args!r}:{sorted(kwargs.items())!r}"
+
+def cached(namespace, ttl=None):
+    """
+    Read-through cache decorator keyed by the call's arguments
+    
+    Entries are keyed by namespace generation, function name and arguments,
+    so invalidate(namespace) retires all of them at once. Cached values are
+    shared between callers and must be treated as read-only.
+    
+    Args:
+        namespace: Invalidation group, e.g. 'reports'
+        ttl: Optional per-entry TTL in seconds (backend default otherwise)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _cache_key(namespace, func, args, kwargs)
+            
+            value = _backend.get(key, _MISSING)
+            if value is not _MISSING:
+                record(namespace, True)
+                return value
+            
+            record(namespace, False)
+            call = _CachedCall()
+            value = _run_in(call, func, *args, **kwargs)
+            if not call.skip:
+                _backend.set(key, value, ttl)
+            return value
+        
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+def cached_iter(namespace, max_items=None, ttl=None):
+    """
+    Read-through cache decorator for generator functions
+    
+    On a hit the cached items are replayed. On a miss items are passed on
+    as the generator produces them and the whole sequence is stored once
+    it is exhausted, so streaming callers still get the first item without
+    waiting for the last. Sequences longer than max_items, generators that
+    aren't run to the end and those that call dont_cache() are not stored.
+    
+    Args:
+        namespace: Invalidation group, e.g. 'reports'
+        max_items: Optional cap on the length of a cached sequence
+        ttl: Optional per-entry TTL in seconds (backend default otherwise)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Keyed before reading, so a write during the read retires the entry
+            key = _cache_key(namespace, func, args, kwargs)
+            
+            items = _backend.get(key, _MISSING)
+            if items is not _MISSING:
+                record(namespace, True)
+                yield from items
+                return
+            
+            record(namespace, False)
+            items = []
+            # The generator's code runs only inside next(), so that is where
+            # it is the current call - interleaved generators don't mix up
+            call = _CachedCall()
+            iterator = func(*args, **kwargs)
+            try:
+                while True:
+                    try:
+                        item = _run_in(call, next, iterator)
+                    except StopIteration:
+                        break
+                    if items is not None:
+                        items.append(item)
+                        if max_items is not None and len(items) > max_items:
+                            items = None  # too long to keep - stream the rest
+                    yield item
+            finally:
+                _run_in(call, iterator.close)
+            
+            if items is not None and not call.skip:
+                _backend.set(key, items, ttl)
+        
+        wrapper.uncached = func
+        return wrapper
+    return decorator
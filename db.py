@@ -0,0 +1,132 @@
+"""
+============================================
+WASTEWATCH - DB.PY
+Shared SQLite connection manager
+============================================
+"""
+
+import sqlite3
+import threading
+
+# Connection tuning
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE = 256 * 1024 * 1024  # 256MB
+STATEMENT_CACHE_SIZE = 256
+
+# One open connection per (thread, database file)
+_local = threading.local()
+
+def _connect(path):
+    """
+    Open and configure a new SQLite connection
+    
+    WAL lets readers run alongside a writer, synchronous=NORMAL is safe
+    under WAL and avoids an fsync per commit, and busy_timeout makes
+    concurrent writers wait for the lock instead of failing immediately.
+    """
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    return conn
+
+def get_connection(path):
+    """
+    Get this thread's connection to a database file, opening it on first use
+    
+    Connections are reused for the life of the thread, so callers must not
+    close them. Commit or roll back before returning instead.
+    
+    Args:
+        path: SQLite database file path
+    
+    Returns:
+        sqlite3.Connection: Configured connection with sqlite3.Row rows
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    
+    conn = connections.get(path)
+    if conn is None:
+        conn = connections[path] = _connect(path)
+    return conn
+
+def close_connections():
+    """Close every connection opened by the current thread"""
+    connections = getattr(_local, 'connections', None)
+    if not connections:
+        return
+    
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+def _end_open_transactions(exception=None):
+    """Roll back anything a request left uncommitted on this thread's connections"""
+    for conn in getattr(_local, 'connections', {}).values():
+        if conn.in_transaction:
+            conn.rollback()
+
+def init_app(app):
+    """
+    Register the connection manager with a Flask app
+    
+    Connections stay open between requests; at the end of each app context
+    any transaction left open by an error is rolled back so the write lock
+    is never held across requests.
+    """
+    app.teardown_appcontext(_end_open_transactions)
+
+def run_migrations(conn, migrations):
+    """
+    Apply pending schema migrations, tracked with PRAGMA user_version
+    
+    Each migration is (version, description, steps) where steps is a list
+    of SQL statements or a callable taking a cursor. Every migration runs
+    in its own transaction together with its user_version bump, and the
+    version is re-read after taking the write lock so concurrent workers
+    starting at once apply each migration exactly once.
+    
+    Args:
+        conn: Database connection
+        migrations: Migrations ordered by ascending version
+    
+    Returns:
+        list: Versions applied by this call
+    """
+    applied = []
+    
+    for version, description, steps in migrations:
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+            continue
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                conn.rollback()
+                continue
+            
+            cursor = conn.cursor()
+            if callable(steps):
+                steps(cursor)
+            else:
+                for statement in steps:
+                    cursor.execute(statement)
+            
+            cursor.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        
+        applied.append(version)
+        print(f"Applied migration {version}: {description}")
+    
+    return applied
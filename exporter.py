@@ -0,0 +1,170 @@
+"""
+============================================
+WASTEWATCH - EXPORTER.PY
+Streaming export of reports to Parquet or gzip CSV
+============================================
+"""
+
+import csv
+import gzip
+import io
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional - exports fall back to gzip CSV
+    pa = None
+
+from reports_db import iter_report_batches, PUBLIC_REPORT_FIELDS
+
+EXPORT_FORMATS = ('parquet', 'csv')
+EXPORT_BATCH_SIZE = 10000  # rows read, converted and written per chunk
+
+EXPORT_MIMETYPES = {'parquet': 'application/vnd.apache.parquet', 'csv': 'application/gzip'}
+EXPORT_EXTENSIONS = {'parquet': 'parquet', 'csv': 'csv.gz'}
+
+# Original photo paths are left out - see reports_db.PUBLIC_REPORT_FIELDS
+EXPORT_FIELDS = PUBLIC_REPORT_FIELDS
+
+INTEGER_FIELDS = {'id', 'user_id', 'duplicate_count', 'change_seq'}
+FLOAT_FIELDS = {'latitude', 'longitude'}
+
+def available_formats():
+    """Export formats usable in this environment, preferred first"""
+    return EXPORT_FORMATS if pa is not None else ('csv',)
+
+def default_format():
+    """Parquet when pyarrow is installed, otherwise gzip CSV"""
+    return available_formats()[0]
+
+class _ChunkSink:
+    """Write-only file object that collects output until it is drained"""
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _parquet_schema():
+    """Arrow schema of an exported report row"""
+    def field_type(field):
+        if field in INTEGER_FIELDS:
+            return pa.int64()
+        if field in FLOAT_FIELDS:
+            return pa.float64()
+        return pa.string()
+    return pa.schema([(field, field_type(field)) for field in EXPORT_FIELDS])
+
+def _parquet_chunks(batches, sink):
+    """Write each batch as a Parquet row group, yielding the bytes produced"""
+    schema = _parquet_schema()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    
+    for rows in batches:
+        columns = [pa.array(column, type=schema.field(index).type)
+                   for index, column in enumerate(zip(*rows))]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        yield sink.drain()
+    
+    writer.close()
+    yield sink.drain()
+
+def _csv_chunks(batches, sink):
+    """Write batches as gzip-compressed CSV with a header row, yielding the bytes produced"""
+    with gzip.GzipFile(fileobj=sink, mode='wb') as compressed:
+        text = io.TextIOWrapper(compressed, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_FIELDS)
+        
+        for rows in batches:
+            writer.writerows(rows)
+            text.flush()
+            yield sink.drain()
+        
+        text.flush()
+        text.detach()
+    yield sink.drain()
+
+def export_chunks(export_format=None, since_id=0, batch_size=EXPORT_BATCH_SIZE, stats=None, **filters):
+    """
+    Stream matching reports, in ID order, as chunks of an export file
+    
+    Reports are read EXPORT_BATCH_SIZE rows at a time and each batch is
+    encoded and handed out before the next is read, so memory stays flat
+    whatever the table size. Passing the last exported ID as since_id gives
+    an incremental export.
+    
+    Args:
+        export_format: 'parquet' or 'csv' (gzip), default_format() if None
+        since_id: Only export reports with a higher ID
+        batch_size: Rows per batch
+        stats: Optional dict that receives 'rows' and 'last_id' as batches are written
+        **filters: Optional listing filters (see reports_db.ReportStream)
+    
+    Yields:
+        bytes: Consecutive pieces of the export file
+    """
+    export_format = export_format or default_format()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if export_format == 'parquet' and pa is None:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package")
+    
+    if stats is None:
+        stats = {}
+    stats.update(rows=0, last_id=since_id)
+    
+    def batches():
+        for rows in iter_report_batches(since_id, batch_size, EXPORT_FIELDS, **filters):
+            stats['rows'] += len(rows)
+            stats['last_id'] = rows[-1][0]
+            yield rows
+    
+    sink = _ChunkSink()
+    if export_format == 'parquet':
+        chunks = _parquet_chunks(batches(), sink)
+    else:
+        chunks = _csv_chunks(batches(), sink)
+    
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+
+def export_reports(path, export_format=None, since_id=0, batch_size=EXPORT_BATCH_SIZE, **filters):
+    """
+    Export matching reports to a file
+    
+    Args:
+        path: Output file path
+        export_format: 'parquet' or 'csv' (gzip), default_format() if None
+        since_id: Only export reports with a higher ID
+        batch_size: Rows per batch
+        **filters: Optional listing filters
+    
+    Returns:
+        dict: 'rows' exported and 'last_id' (the since_id for the next incremental export)
+    """
+    stats = {}
+    with open(path, 'wb') as output:
+        for chunk in export_chunks(export_format, since_id, batch_size, stats, **filters):
+            output.write(chunk)
+    return stats
@@ -0,0 +1,139 @@
+"""
+============================================
+WASTEWATCH - GEO.PY
+Geographic helpers for location based report lookups
+============================================
+"""
+
+import math
+
+# Mean Earth radius in meters
+EARTH_RADIUS_M = 6371008.8
+
+# Web Mercator cannot represent latitudes beyond this
+MAX_MERCATOR_LAT = 85.0511287798
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two coordinates
+    
+    Args:
+        lat1: Latitude of the first point
+        lon1: Longitude of the first point
+        lat2: Latitude of the second point
+        lon2: Longitude of the second point
+    
+    Returns:
+        float: Distance in meters
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(lat, lon, radius_m):
+    """
+    Bounding box that contains every point within radius_m of a coordinate
+    
+    The box is clamped to valid latitude/longitude ranges, so circles that
+    cross a pole or the antimeridian get a conservatively wide box.
+    
+    Args:
+        lat: Center latitude
+        lon: Center longitude
+        radius_m: Radius in meters
+    
+    Returns:
+        tuple: (min_lat, min_lon, max_lat, max_lon)
+    """
+    d_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat = max(-90.0, lat - d_lat)
+    max_lat = min(90.0, lat + d_lat)
+    
+    cos_lat = math.cos(math.radians(lat))
+    if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat < 1e-12:
+        return min_lat, -180.0, max_lat, 180.0
+    
+    d_lon = math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat))
+    if d_lon >= 180.0 or lon - d_lon < -180.0 or lon + d_lon > 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    
+    return min_lat, lon - d_lon, max_lat, lon + d_lon
+
+def valid_coordinates(lat, lon):
+    """
+    Check that a coordinate is finite and within latitude/longitude range
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+    
+    Returns:
+        bool: True if the coordinate is usable
+    """
+    return (math.isfinite(lat) and math.isfinite(lon)
+            and -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0)
+
+def parse_coordinates(value):
+    """
+    Parse a "lat,lon" string
+    
+    Args:
+        value: Raw string such as "19.0760,72.8777"
+    
+    Returns:
+        tuple or None: (lat, lon) if valid, None otherwise
+    """
+    if not value:
+        return None
+    
+    try:
+        lat, lon = (float(part) for part in value.split(','))
+    except ValueError:
+        return None
+    
+    if not valid_coordinates(lat, lon):
+        return None
+    return lat, lon
+
+def latlon_to_tile(lat, lon, zoom):
+    """
+    Web Mercator (slippy map) tile containing a coordinate
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        zoom: Zoom level
+    
+    Returns:
+        tuple: (x, y) tile indices
+    """
+    n = 1 << zoom
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    lat_rad = math.radians(lat)
+    
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds(zoom, x, y):
+    """
+    Bounding box of a Web Mercator tile
+    
+    Args:
+        zoom: Zoom level
+        x: Tile column
+        y: Tile row
+    
+    Returns:
+        tuple: (min_lat, min_lon, max_lat, max_lon)
+    """
+    n = 1 << zoom
+    
+    def tile_lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    
+    return tile_lat(y + 1), x / n * 360.0 - 180.0, tile_lat(y), (x + 1) / n * 360.0 - 180.0
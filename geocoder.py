@@ -0,0 +1,186 @@
+"""
+============================================
+WASTEWATCH - GEOCODER.PY
+Offline reverse geocoding from a local gazetteer file
+
+The gazetteer is a CSV file with a header row and the columns
+name, latitude, longitude and optionally area (the containing
+district or city), e.g.
+    
+    name,latitude,longitude,area
+    Andheri West,19.1364,72.8296,Mumbai
+
+Coordinates resolve to the nearest place within MAX_DISTANCE_M,
+labelled "name, area". No network service is ever called.
+============================================
+"""
+
+import csv
+import math
+import threading
+
+from geo import haversine_m, bounding_box, valid_coordinates
+from cache import LRUCache, record
+
+# Places are bucketed into a grid of cells this many degrees wide
+GRID_DEGREES = 0.05
+
+# Nearest places further away than this are not used as a label
+MAX_DISTANCE_M = 5000
+
+# Lookups are cached by coordinates rounded to this many decimals (~110 m)
+COORD_PRECISION = 3
+CACHE_SIZE = 10000
+
+_MISSING = object()
+
+class Gazetteer:
+    """Named places in an in-memory grid index for nearest-place lookups"""
+    
+    def __init__(self, places, max_distance_m=MAX_DISTANCE_M, cell_degrees=GRID_DEGREES):
+        """
+        Args:
+            places: Iterable of (latitude, longitude, label)
+            max_distance_m: Largest distance at which a place labels a coordinate
+            cell_degrees: Grid cell size in degrees
+        """
+        self.max_distance_m = max_distance_m
+        self.cell_degrees = cell_degrees
+        self._cells = {}  # (row, column) -> [(latitude, longitude, label), ...]
+        self._size = 0
+        
+        for latitude, longitude, label in places:
+            self._cells.setdefault(self._cell(latitude, longitude), []).append((latitude, longitude, label))
+            self._size += 1
+    
+    def __len__(self):
+        return self._size
+    
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+    
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Read a gazetteer CSV file (see the module docstring for its format)
+        
+        Rows with a missing name or invalid coordinates are skipped.
+        
+        Args:
+            path: CSV file path
+            **kwargs: Passed to Gazetteer()
+        
+        Returns:
+            Gazetteer: The loaded index
+        """
+        places = []
+        with open(path, newline='', encoding='utf-8') as source:
+            for row in csv.DictReader(source):
+                name = (row.get('name') or '').strip()
+                try:
+                    latitude = float(row['latitude'])
+                    longitude = float(row['longitude'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if not name or not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+                    continue
+                area = (row.get('area') or '').strip()
+                places.append((latitude, longitude, f"{name}, {area}" if area else name))
+        return cls(places, **kwargs)
+    
+    def nearest(self, latitude, longitude):
+        """
+        Label of the closest place within max_distance_m
+        
+        Only the grid cells overlapping the search circle's bounding box
+        are scanned.
+        
+        Args:
+            latitude: Latitude
+            longitude: Longitude
+        
+        Returns:
+            str or None: Place label, None if nothing is close enough
+        """
+        min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, self.max_distance_m)
+        min_row, min_column = self._cell(min_lat, min_lon)
+        max_row, max_column = self._cell(max_lat, max_lon)
+        
+        best_label = None
+        best_distance = self.max_distance_m
+        for row in range(min_row, max_row + 1):
+            for column in range(min_column, max_column + 1):
+                for place_lat, place_lon, label in self._cells.get((row, column), ()):
+                    distance = haversine_m(latitude, longitude, place_lat, place_lon)
+                    if distance <= best_distance:
+                        best_label = label
+                        best_distance = distance
+        return best_label
+
+_gazetteer = None
+_gazetteer_path = None
+_load_lock = threading.Lock()
+_lookups = LRUCache(maxsize=CACHE_SIZE, ttl=math.inf)
+
+def configure_geocoder(path):
+    """
+    Set the gazetteer file; it is loaded on the first lookup
+    
+    Args:
+        path: Gazetteer CSV path, or None to turn reverse geocoding off
+    """
+    global _gazetteer, _gazetteer_path
+    with _load_lock:
+        _gazetteer = None
+        _gazetteer_path = path
+        _lookups.clear()
+
+def get_gazetteer():
+    """
+    Return the loaded gazetteer, loading it once on first use
+    
+    Returns:
+        Gazetteer or None: None if no gazetteer is configured or it can't be read
+    """
+    global _gazetteer, _gazetteer_path
+    if _gazetteer is None and _gazetteer_path:
+        with _load_lock:
+            if _gazetteer is None and _gazetteer_path:
+                try:
+                    _gazetteer = Gazetteer.load(_gazetteer_path)
+                    print(f"Gazetteer loaded: {len(_gazetteer)} places from {_gazetteer_path}")
+                except OSError as e:
+                    print(f"Could not load gazetteer {_gazetteer_path}: {e}")
+                    _gazetteer_path = None
+    return _gazetteer
+
+def reverse_geocode(latitude, longitude):
+    """
+    Human-readable area for a coordinate
+    
+    Coordinates are rounded to COORD_PRECISION decimals before the lookup,
+    so nearby reports share one cached result.
+    
+    Args:
+        latitude: Latitude
+        longitude: Longitude
+    
+    Returns:
+        str or None: e.g. 'Andheri West, Mumbai', None if unknown, the
+            coordinate is invalid (NaN, infinite, out of range) or no
+            gazetteer is configured
+    """
+    gazetteer = get_gazetteer()
+    if gazetteer is None or not valid_coordinates(latitude, longitude):
+        return None
+    
+    key = (round(latitude, COORD_PRECISION), round(longitude, COORD_PRECISION))
+    label = _lookups.get(key, _MISSING)  # None is a valid (cached) result
+    if label is not _MISSING:
+        record('geocode', True)
+        return label
+    
+    record('geocode', False)
+    label = gazetteer.nearest(*key)
+    _lookups.set(key, label)
+    return label
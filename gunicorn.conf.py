@@ -0,0 +1,37 @@
+"""
+============================================
+WASTEWATCH - GUNICORN.CONF.PY
+Gunicorn settings for serving wsgi:app
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+Override with WEB_CONCURRENCY (worker processes), WEB_THREADS
+(threads per worker) and BIND.
+============================================
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+# Processes for CPU-bound work (page rendering, uploads); threads keep a
+# worker responsive while others wait on SQLite or stream responses
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread'
+
+# gthread workers heartbeat independently of request length, so this only
+# catches hung workers. It doesn't free threads: every open change stream
+# (/api/reports/changes/stream) holds one of the worker's threads until it ends,
+# which is why streams last at most SSE_MAX_SECONDS (app.py) and clients
+# reconnect with Last-Event-ID. Raise WEB_THREADS if many clients stream.
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Each worker must open its own database connections (see wsgi.py)
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
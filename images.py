@@ -0,0 +1,135 @@
+"""
+============================================
+WASTEWATCH - IMAGES.PY
+Background generation of web-sized and thumbnail photo variants
+============================================
+"""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional - listings then show no photos
+    Image = None
+
+from reports_db import set_report_photo_variants
+
+# Variant settings
+WEB_MAX_SIZE = 1280
+THUMB_MAX_SIZE = 320
+WEB_QUALITY = 80
+THUMB_QUALITY = 70
+IMAGE_WORKERS = 2
+
+# Variant file names add these to the original's stem; only variants are served
+VARIANT_SUFFIXES = ('_web', '_thumb')
+
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix='image-worker')
+
+def _variant_format():
+    """Prefer WebP when Pillow was built with it, otherwise JPEG"""
+    if features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+def _save_variant(image, max_size, quality, path, image_format):
+    """Write a downscaled copy of image to path without any metadata"""
+    variant = image.copy()
+    variant.thumbnail((max_size, max_size), Image.LANCZOS)
+    
+    # Write then rename, since deduplicated uploads can share a variant path
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            # Pillow only writes EXIF when it is passed explicitly, so variants carry none
+            variant.save(temp_file, image_format, quality=quality, optimize=image_format == 'JPEG')
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def is_photo_variant(path):
+    """Return True if path names a generated (metadata-free) photo variant"""
+    return os.path.splitext(path)[0].endswith(VARIANT_SUFFIXES)
+
+def create_photo_variants(photo_path, upload_folder):
+    """
+    Create web-sized and thumbnail variants next to an uploaded photo
+    
+    The photo is rotated according to its EXIF orientation and the variants
+    are written without EXIF, so GPS and device metadata are not served.
+    Existing variants are reused.
+    
+    Args:
+        photo_path: Path of the original photo relative to upload_folder
+        upload_folder: Root upload folder
+    
+    Returns:
+        tuple or None: (web_path, thumb_path) relative to upload_folder,
+            None if the photo can't be processed
+    """
+    if Image is None:
+        return None
+    
+    image_format, extension = _variant_format()
+    stem = os.path.splitext(photo_path)[0]
+    web_path = f"{stem}{VARIANT_SUFFIXES[0]}.{extension}"
+    thumb_path = f"{stem}{VARIANT_SUFFIXES[1]}.{extension}"
+    
+    web_file = os.path.join(upload_folder, web_path)
+    thumb_file = os.path.join(upload_folder, thumb_path)
+    if os.path.exists(web_file) and os.path.exists(thumb_file):
+        return web_path, thumb_path
+    
+    try:
+        with Image.open(os.path.join(upload_folder, photo_path)) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            
+            _save_variant(image, WEB_MAX_SIZE, WEB_QUALITY, web_file, image_format)
+            _save_variant(image, THUMB_MAX_SIZE, THUMB_QUALITY, thumb_file, image_format)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"Could not create variants for {photo_path}: {e}")
+        return None
+    
+    return web_path, thumb_path
+
+def process_report_photo(report_id, photo_path, upload_folder):
+    """
+    Create variants for a report's photo and record them on the report
+    
+    Args:
+        report_id: Report ID
+        photo_path: Path of the original photo relative to upload_folder
+        upload_folder: Root upload folder
+    
+    Returns:
+        bool: True if variants were recorded
+    """
+    variants = create_photo_variants(photo_path, upload_folder)
+    if variants is None:
+        return False
+    
+    success, message = set_report_photo_variants(report_id, *variants)
+    if not success:
+        print(f"Could not record variants for report {report_id}: {message}")
+    return success
+
+def submit_report_photo(report_id, photo_path, upload_folder):
+    """
+    Queue variant generation for a new report on the background workers
+    
+    Args:
+        report_id: Report ID
+        photo_path: Path of the original photo relative to upload_folder
+        upload_folder: Root upload folder
+    
+    Returns:
+        Future or None: The queued job, None if Pillow is unavailable
+    """
+    if Image is None:
+        return None
+    return _executor.submit(process_report_photo, report_id, photo_path, upload_folder)
@@ -0,0 +1,139 @@
+"""
+============================================
+WASTEWATCH - IMPORTER.PY
+Batch import of reports from CSV / JSONL files
+============================================
+"""
+
+import csv
+import json
+import os
+import time
+
+from reports_db import create_reports_bulk, validate_bulk_report
+from uploads import store_file
+from images import submit_report_photo
+
+DEFAULT_BATCH_SIZE = 1000
+
+def read_records(path):
+    """
+    Stream records from a CSV (with header row) or JSONL file
+    
+    Args:
+        path: Input file path; '.csv' files are read as CSV, anything else as JSONL
+    
+    Yields:
+        tuple: (line_number: int, record: dict or None, error: str or None)
+    """
+    with open(path, newline='', encoding='utf-8') as source:
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(source)
+            for record in reader:
+                yield reader.line_num, record, None
+            return
+        
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, record, None
+
+def _prepare_record(record, upload_folder, photo_dir, default_user_id):
+    """
+    Turn an input record into create_reports_bulk keyword arguments
+    
+    A 'photo' field names a local file (relative to photo_dir) that is copied
+    into the upload store; a 'photo_path' field is used as is, relative to
+    the upload folder. The record is validated first, so rejected records
+    leave nothing behind in the upload store.
+    
+    Returns:
+        tuple: (report: dict or None, error: str or None)
+    """
+    report = dict(record)
+    report['user_id'] = report.get('user_id') or default_user_id
+    
+    photo = report.pop('photo', None)
+    if photo:
+        source = photo if os.path.isabs(photo) or not photo_dir else os.path.join(photo_dir, photo)
+        if not os.path.isfile(source):
+            return None, f"Photo not found: {source}"
+        report['photo_path'] = source  # stands in for the stored path while validating
+    
+    error = validate_bulk_report(report)
+    if error:
+        return None, error
+    
+    if photo:
+        report['photo_path'], _ = store_file(source, upload_folder)
+    return report, None
+
+def import_reports(path, upload_folder, photo_dir=None, batch_size=DEFAULT_BATCH_SIZE,
+                   default_user_id=None, on_batch=None):
+    """
+    Import reports from a file in batches, one transaction per batch
+    
+    Photos of imported reports are queued for variant generation.
+    
+    Args:
+        path: CSV or JSONL input file
+        upload_folder: Upload store root for imported photos
+        photo_dir: Optional directory photo fields are relative to
+        batch_size: Reports per transaction
+        default_user_id: Reporter ID for records without a user_id
+        on_batch: Optional callback(stats) after every committed batch
+    
+    Returns:
+        dict: Totals - imported, rejected, seconds and errors (line, message)
+    """
+    stats = {'imported': 0, 'rejected': 0, 'seconds': 0.0, 'errors': []}
+    start = time.perf_counter()
+    
+    def flush(batch):
+        reports = [report for _, report in batch]
+        success, message, report_ids, errors = create_reports_bulk(reports)
+        
+        if not success:
+            stats['rejected'] += len(batch)
+            stats['errors'].append((batch[0][0], message))
+            return
+        
+        rejected = {index for index, _ in errors}
+        stats['errors'].extend((batch[index][0], error) for index, error in errors)
+        stats['rejected'] += len(rejected)
+        stats['imported'] += len(report_ids)
+        
+        valid = [report for index, report in enumerate(reports) if index not in rejected]
+        for report_id, report in zip(report_ids, valid):
+            submit_report_photo(report_id, report['photo_path'], upload_folder)
+    
+    batch = []
+    for line_number, record, error in read_records(path):
+        if record is not None:
+            report, error = _prepare_record(record, upload_folder, photo_dir, default_user_id)
+        if error:
+            stats['rejected'] += 1
+            stats['errors'].append((line_number, error))
+            continue
+        
+        batch.append((line_number, report))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+            stats['seconds'] = time.perf_counter() - start
+            if on_batch:
+                on_batch(stats)
+    
+    if batch:
+        flush(batch)
+    
+    stats['seconds'] = time.perf_counter() - start
+    return stats
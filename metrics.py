@@ -0,0 +1,212 @@
+"""
+============================================
+WASTEWATCH - METRICS.PY
+Request, query and upload timing exposed in Prometheus text format
+============================================
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+
+from flask import Response, g, request
+
+from cache import cache_stats
+
+# Histogram bucket upper bounds (seconds)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+UPLOAD_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# name -> (type, help text, buckets or None)
+METRICS = {
+    'wastewatch_http_request_duration_seconds': (
+        'histogram', 'Time from request start until the response is returned by the view', REQUEST_BUCKETS),
+    'wastewatch_db_query_duration_seconds': (
+        'histogram', 'Latency of reports/auth database functions', QUERY_BUCKETS),
+    'wastewatch_db_rows_total': (
+        'counter', 'Rows returned by database functions', None),
+    'wastewatch_upload_duration_seconds': (
+        'histogram', 'Time to stream an upload into the store', UPLOAD_BUCKETS),
+    'wastewatch_upload_bytes_total': (
+        'counter', 'Bytes received in photo uploads', None),
+    'wastewatch_uploads_total': (
+        'counter', 'Photo uploads by whether the content was already stored', None),
+}
+
+_enabled = True
+_lock = threading.Lock()
+_values = {}  # (name, labels) -> float for counters, [bucket counts..., sum, count] for histograms
+
+def configure(enabled):
+    """Turn recording on or off; when off every hook returns after one flag check"""
+    global _enabled
+    _enabled = enabled
+
+def is_enabled():
+    return _enabled
+
+def inc(name, amount=1, **labels):
+    """Add to a counter"""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _values[key] = _values.get(key, 0) + amount
+
+def observe(name, value, **labels):
+    """Record one histogram observation"""
+    if not _enabled:
+        return
+    buckets = METRICS[name][2]
+    key = (name, tuple(sorted(labels.items())))
+    index = bisect.bisect_left(buckets, value)
+    with _lock:
+        series = _values.get(key)
+        if series is None:
+            series = _values[key] = [0] * (len(buckets) + 2)
+        if index < len(buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+def _count_rows(result):
+    """Best-effort row count of a database function's return value"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])  # e.g. (reports, next_cursor, prev_cursor)
+    return 0 if result is None or isinstance(result, (bool, tuple)) else 1
+
+def timed(func):
+    """
+    Record latency and row counts of a database function
+    
+    Generator functions are timed inside the generator only - the time
+    spent producing each item, not the caller's work between items (e.g.
+    rendering and sending a streamed page) - and each yielded item counts
+    as a row. The total is recorded once the generator finishes or is
+    closed.
+    """
+    name = func.__qualname__
+    
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if not _enabled:
+                return (yield from func(*args, **kwargs))
+            rows = 0
+            elapsed = 0.0
+            iterator = func(*args, **kwargs)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        break
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    rows += 1
+                    yield item
+            finally:
+                # Closed early: the generator's own cleanup counts too
+                start = time.perf_counter()
+                iterator.close()
+                elapsed += time.perf_counter() - start
+                observe('wastewatch_db_query_duration_seconds', elapsed, function=name)
+                inc('wastewatch_db_rows_total', rows, function=name)
+        return generator_wrapper
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        observe('wastewatch_db_query_duration_seconds', time.perf_counter() - start, function=name)
+        inc('wastewatch_db_rows_total', _count_rows(result), function=name)
+        return result
+    return wrapper
+
+def record_upload(size, seconds, is_new):
+    """Count one stored upload"""
+    if not _enabled:
+        return
+    observe('wastewatch_upload_duration_seconds', seconds)
+    inc('wastewatch_upload_bytes_total', size)
+    inc('wastewatch_uploads_total', deduplicated='false' if is_new else 'true')
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+def render():
+    """
+    Current values in the Prometheus text exposition format
+    
+    Returns:
+        str: Exposition text, including the cache hit/miss counters
+    """
+    with _lock:
+        snapshot = {key: (list(value) if isinstance(value, list) else value) for key, value in _values.items()}
+    
+    lines = []
+    for name, (metric_type, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for (series_name, labels), value in sorted(snapshot.items()):
+            if series_name != name:
+                continue
+            if metric_type == 'counter':
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {value[-1]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {value[-2]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {value[-1]}')
+    
+    lines.append('# HELP wastewatch_cache_requests_total Read-through cache lookups')
+    lines.append('# TYPE wastewatch_cache_requests_total counter')
+    for namespace, counts in sorted(cache_stats().items()):
+        lines.append(f'wastewatch_cache_requests_total{{namespace="{namespace}",result="hit"}} {counts["hits"]}')
+        lines.append(f'wastewatch_cache_requests_total{{namespace="{namespace}",result="miss"}} {counts["misses"]}')
+    
+    return '\n'.join(lines) + '\n'
+
+def init_app(app):
+    """
+    Time every request and serve /metrics
+    
+    Durations are measured until the view returns, so for streamed
+    responses they cover time to first byte rather than the whole body.
+    """
+    configure(app.config.get('METRICS_ENABLED', True))
+    
+    @app.before_request
+    def start_timer():
+        if _enabled:
+            g.metrics_start = time.perf_counter()
+    
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            observe('wastewatch_http_request_duration_seconds', time.perf_counter() - start,
+                    method=request.method, endpoint=request.endpoint or 'unknown',
+                    status=str(response.status_code))
+        return response
+    
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus scrape endpoint"""
+        if not _enabled:
+            return Response('metrics are disabled\n', status=404, mimetype='text/plain')
+        return Response(render(), mimetype='text/plain; version=0.0.4')
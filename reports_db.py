@@ -7,24 +7,217 @@ Reports database module with SQLite
 
 import sqlite3
 import os
-from datetime import datetime
+import math
+import base64
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from db import get_connection, run_migrations
+from geo import haversine_m, bounding_box, latlon_to_tile
+from cache import cached, cached_iter, invalidate, dont_cache, get_cache, record
+from metrics import timed
 
 # Database file path
 DB_PATH = 'reports.db'
 
+# Columns returned for every report, in SELECT order
+REPORT_FIELDS = (
+    'id', 'user_id', 'username', 'latitude', 'longitude', 'readable_area',
+    'photo_path', 'waste_type', 'date_time', 'description', 'severity',
+    'landmark', 'report_status', 'created_at', 'photo_web_path', 'photo_thumb_path',
+    'duplicate_count', 'change_seq'
+)
+REPORT_COLUMNS = ', '.join(REPORT_FIELDS)
+REPORT_COLUMNS_ALIASED = ', '.join(f'r.{field}' for field in REPORT_FIELDS)
+
+# Fields handed out by the API and in exports. photo_path is the original
+# upload, which may carry EXIF (GPS, device) metadata; only its stripped web
+# and thumbnail variants are ever served.
+PUBLIC_REPORT_FIELDS = tuple(field for field in REPORT_FIELDS if field != 'photo_path')
+
+# Page size limits for paginated listings
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+MAX_STREAM_PAGE_SIZE = 1000  # streamed API pages are never held in memory
+
+# Longest streamed listing (e.g. a user's dashboard) kept in the cache
+MAX_CACHED_STREAM_ROWS = 500
+
+# Most reports one batch status update may change
+MAX_STATUS_BATCH = 500
+
+# Wakes change-feed listeners in this process when reports are written
+_report_changes = threading.Condition()
+
+# Radius limits for proximity searches (meters)
+DEFAULT_NEAR_RADIUS_M = 1000
+MAX_NEAR_RADIUS_M = 50000
+
+# Proximity searches look in rings growing by this factor from the first
+# ring's radius out to the requested one, stopping at the first that holds
+# enough reports - dense areas never read the whole search area
+NEAR_FIRST_RING_M = 250
+NEAR_RING_GROWTH = 4
+
+# Duplicate detection: open reports of the same waste type this close in
+# space and time absorb new submissions instead of creating new reports
+DUPLICATE_RADIUS_M = 25
+DUPLICATE_WINDOW_HOURS = 48
+REPORT_MERGED_MESSAGE = "This spot was already reported recently - your report was added to it."
+
+# Map clustering: aggregates are kept for zoom levels 0..MAX_CLUSTER_ZOOM,
+# each tile split into a (2^CLUSTER_CELL_BITS)^2 grid of cells
+MAX_CLUSTER_ZOOM = 16
+CLUSTER_CELL_BITS = 3
+CLUSTER_CACHE_TTL = 30  # seconds
+
+# Summary statistics: report counts per value of each dimension, kept in
+# step by triggers. dimension -> (source column, value expression over {row})
+STAT_DIMENSIONS = {
+    'waste_type': ('waste_type', '{row}.waste_type'),
+    'severity': ('severity', "COALESCE({row}.severity, '')"),
+    'status': ('report_status', '{row}.report_status'),
+    'area': ('readable_area', "COALESCE({row}.readable_area, '')"),
+    'day': ('created_at', 'date({row}.created_at)'),
+}
+STATS_TOP_AREAS = 20
+STATS_DEFAULT_DAYS = 30
+
+# Full-text search over these report columns, in FTS5 column order
+SEARCH_FIELDS = ('description', 'landmark', 'readable_area', 'username')
+MAX_SEARCH_TERMS = 8
+
 def get_db_connection():
-    """Create and return a database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Return this thread's shared connection to the database"""
+    return get_connection(DB_PATH)
 
-def init_reports_db():
-    """Initialize the reports database and create reports table if it doesn't exist"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def _stats_upsert(dimension, row, delta):
+    """Trigger statement adding delta to the count of a row's value in one dimension"""
+    expression = STAT_DIMENSIONS[dimension][1].format(row=row)
+    return f'''
+            INSERT INTO report_stats (dimension, value, report_count)
+            VALUES ('{dimension}', {expression}, {delta})
+            ON CONFLICT (dimension, value) DO UPDATE SET
+                report_count = report_count + excluded.report_count;'''
+
+def _create_stats_tables(cursor):
+    """Migration: summary counts per dimension value, maintained by triggers and backfilled"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_stats (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            report_count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_report_stats_count ON report_stats (dimension, report_count)')
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS report_stats_insert AFTER INSERT ON reports
+        BEGIN{''.join(_stats_upsert(dimension, 'NEW', 1) for dimension in STAT_DIMENSIONS)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS report_stats_delete AFTER DELETE ON reports
+        BEGIN{''.join(_stats_upsert(dimension, 'OLD', -1) for dimension in STAT_DIMENSIONS)}
+        END
+    ''')
+    
+    # One update trigger per dimension, so only changed values are touched
+    for dimension, (column, expression) in STAT_DIMENSIONS.items():
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS report_stats_update_{dimension} AFTER UPDATE OF {column} ON reports
+            WHEN {expression.format(row='OLD')} IS NOT {expression.format(row='NEW')}
+            BEGIN{_stats_upsert(dimension, 'OLD', -1)}{_stats_upsert(dimension, 'NEW', 1)}
+            END
+        ''')
+    
+    cursor.execute('SELECT EXISTS (SELECT 1 FROM report_stats)')
+    if not cursor.fetchone()[0]:
+        _rebuild_stats(cursor)
+
+def _rebuild_stats(cursor):
+    """
+    Recompute the summary counts on the caller's cursor with one GROUP BY per dimension
+    
+    Returns:
+        int: Number of (dimension, value) rows written
+    """
+    cursor.execute('DELETE FROM report_stats')
+    for dimension, (column, expression) in STAT_DIMENSIONS.items():
+        cursor.execute(f'''
+            INSERT INTO report_stats (dimension, value, report_count)
+            SELECT '{dimension}', {expression.format(row='reports')}, COUNT(*)
+            FROM reports
+            GROUP BY 2
+        ''')
+    
+    cursor.execute('SELECT COUNT(*) FROM report_stats')
+    return cursor.fetchone()[0]
+
+def _create_search_index(cursor):
+    """Migration: FTS5 index over the report text columns, kept in sync by triggers"""
+    columns = ', '.join(SEARCH_FIELDS)
+    new_values = ', '.join(f'NEW.{field}' for field in SEARCH_FIELDS)
+    old_values = ', '.join(f'OLD.{field}' for field in SEARCH_FIELDS)
+    
+    # External content: the index stores only tokens, the text stays in reports
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+            {columns},
+            content='reports', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS reports_fts_insert AFTER INSERT ON reports
+        BEGIN
+            INSERT INTO reports_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS reports_fts_delete AFTER DELETE ON reports
+        BEGIN
+            INSERT INTO reports_fts (reports_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+        END
+    ''')
+    # Only edits to indexed text re-index a row - status and sequence updates don't
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS reports_fts_update AFTER UPDATE OF {columns} ON reports
+        BEGIN
+            INSERT INTO reports_fts (reports_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO reports_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    ''')
     
-    # Create reports table
+    cursor.execute("INSERT INTO reports_fts (reports_fts) VALUES ('rebuild')")
+
+def _create_clusters_table(cursor):
+    """Migration: per-zoom cluster aggregates, backfilled from existing reports"""
     cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_clusters (
+            zoom INTEGER NOT NULL,
+            cell_x INTEGER NOT NULL,
+            cell_y INTEGER NOT NULL,
+            waste_type TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            report_count INTEGER NOT NULL,
+            lat_sum REAL NOT NULL,
+            lon_sum REAL NOT NULL,
+            PRIMARY KEY (zoom, cell_x, cell_y, waste_type, severity)
+        ) WITHOUT ROWID
+    ''')
+    
+    cursor.execute('SELECT EXISTS (SELECT 1 FROM report_clusters)')
+    if not cursor.fetchone()[0]:
+        _rebuild_clusters(cursor)
+
+# Schema history for reports.db, applied in order by init_reports_db.
+# Never edit a released migration - append a new one instead.
+MIGRATIONS = [
+    (1, 'create reports table', [
+        '''
         CREATE TABLE IF NOT EXISTS reports (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -41,246 +234,1709 @@ def init_reports_db():
             report_status TEXT DEFAULT 'Pending' CHECK(report_status IN ('Pending', 'In Progress', 'Cleaned')),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-    ''')
-    
-    conn.commit()
-    conn.close()
+        ''',
+    ]),
+    (2, 'index reports for keyset pagination', [
+        'CREATE INDEX IF NOT EXISTS idx_reports_created_at_id ON reports (created_at, id)',
+    ]),
+    (3, 'spatial index over report coordinates', [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS reports_rtree USING rtree(
+            id, min_lat, max_lat, min_lon, max_lon
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reports_rtree_insert AFTER INSERT ON reports
+        BEGIN
+            INSERT INTO reports_rtree (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reports_rtree_update AFTER UPDATE OF latitude, longitude ON reports
+        BEGIN
+            UPDATE reports_rtree
+            SET min_lat = NEW.latitude, max_lat = NEW.latitude,
+                min_lon = NEW.longitude, max_lon = NEW.longitude
+            WHERE id = NEW.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reports_rtree_delete AFTER DELETE ON reports
+        BEGIN
+            DELETE FROM reports_rtree WHERE id = OLD.id;
+        END
+        ''',
+        '''
+        INSERT INTO reports_rtree (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT id, latitude, latitude, longitude, longitude
+        FROM reports
+        WHERE id NOT IN (SELECT id FROM reports_rtree)
+        ''',
+    ]),
+    (4, 'map cluster aggregates', _create_clusters_table),
+    (5, 'secondary indexes for dashboard and filtered listings', [
+        'CREATE INDEX IF NOT EXISTS idx_reports_user_created ON reports (user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_reports_status_created ON reports (report_status, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_reports_type_severity ON reports (waste_type, severity)',
+    ]),
+    (6, 'web and thumbnail photo variants', [
+        'ALTER TABLE reports ADD COLUMN photo_web_path TEXT',
+        'ALTER TABLE reports ADD COLUMN photo_thumb_path TEXT',
+    ]),
+    (7, 'duplicate submissions linked to existing reports', [
+        'ALTER TABLE reports ADD COLUMN duplicate_count INTEGER NOT NULL DEFAULT 0',
+        '''
+        CREATE TABLE IF NOT EXISTS report_duplicates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report_id INTEGER NOT NULL REFERENCES reports (id),
+            user_id INTEGER NOT NULL,
+            photo_path TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_report_duplicates_report ON report_duplicates (report_id)',
+    ]),
+    (8, 'change sequence numbers for API validators', [
+        'ALTER TABLE reports ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0',
+        'UPDATE reports SET change_seq = id',
+        'CREATE INDEX IF NOT EXISTS idx_reports_change_seq ON reports (change_seq)',
+        # Every insert or update moves the row to the end of the sequence;
+        # writers are serialized, so MAX() + 1 is unique
+        '''
+        CREATE TRIGGER IF NOT EXISTS reports_change_seq_insert AFTER INSERT ON reports
+        BEGIN
+            UPDATE reports SET change_seq = (SELECT MAX(change_seq) FROM reports) + 1
+            WHERE id = NEW.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reports_change_seq_update AFTER UPDATE ON reports
+        WHEN NEW.change_seq = OLD.change_seq
+        BEGIN
+            UPDATE reports SET change_seq = (SELECT MAX(change_seq) FROM reports) + 1
+            WHERE id = NEW.id;
+        END
+        ''',
+    ]),
+    (9, 'append-only report status history', [
+        '''
+        CREATE TABLE IF NOT EXISTS report_status_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report_id INTEGER NOT NULL REFERENCES reports (id),
+            old_status TEXT NOT NULL,
+            new_status TEXT NOT NULL,
+            actor_id INTEGER,
+            changed_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_status_history_changed ON report_status_history (changed_at)',
+        'CREATE INDEX IF NOT EXISTS idx_status_history_report ON report_status_history (report_id)',
+        '''
+        CREATE TRIGGER IF NOT EXISTS report_status_history_no_update BEFORE UPDATE ON report_status_history
+        BEGIN
+            SELECT RAISE(ABORT, 'report_status_history is append-only');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS report_status_history_no_delete BEFORE DELETE ON report_status_history
+        BEGIN
+            SELECT RAISE(ABORT, 'report_status_history is append-only');
+        END
+        ''',
+    ]),
+    (10, 'summary statistics by waste type, severity, status, area and day', _create_stats_tables),
+    (11, 'full-text search over report text', _create_search_index),
+    # Photos were stored as 'static/uploads/...' paths; they are now relative
+    # to the UPLOAD_FOLDER setting and served from /uploads
+    (12, 'photo paths relative to the upload folder', [
+        '''
+        UPDATE reports
+        SET photo_path = CASE WHEN photo_path LIKE 'static/uploads/%' THEN substr(photo_path, 16) ELSE photo_path END,
+            photo_web_path = CASE WHEN photo_web_path LIKE 'static/uploads/%' THEN substr(photo_web_path, 16) ELSE photo_web_path END,
+            photo_thumb_path = CASE WHEN photo_thumb_path LIKE 'static/uploads/%' THEN substr(photo_thumb_path, 16) ELSE photo_thumb_path END
+        WHERE photo_path LIKE 'static/uploads/%'
+           OR photo_web_path LIKE 'static/uploads/%'
+           OR photo_thumb_path LIKE 'static/uploads/%'
+        ''',
+        '''
+        UPDATE report_duplicates
+        SET photo_path = substr(photo_path, 16)
+        WHERE photo_path LIKE 'static/uploads/%'
+        ''',
+    ]),
+    (13, 'status history ordered by change time', [
+        # Pages are read in (changed_at, id) order; the old index covered the
+        # same columns (id is the rowid) but didn't say so
+        'DROP INDEX IF EXISTS idx_status_history_changed',
+        'CREATE INDEX IF NOT EXISTS idx_status_history_changed_id ON report_status_history (changed_at, id)',
+    ]),
+    (14, 'type and severity listings ordered from the index', [
+        # Listings filtered on both read pages in (created_at, id) order; with
+        # those columns in the index they come straight off it, no sort step
+        'DROP INDEX IF EXISTS idx_reports_type_severity',
+        'CREATE INDEX IF NOT EXISTS idx_reports_type_severity_created ON reports (waste_type, severity, created_at, id)',
+    ]),
+]
+
+def init_reports_db():
+    """Initialize the reports database and bring its schema up to date"""
+    conn = get_db_connection()
+    run_migrations(conn, MIGRATIONS)
     print(f"Reports database initialized: {DB_PATH}")
 
-def create_report(user_id, username, latitude, longitude, readable_area, photo_path, waste_type, description=None, severity=None, landmark=None):
+class Report(namedtuple('ReportRecord', REPORT_FIELDS + ('distance_m',), defaults=(None,))):
     """
-    Create a new waste report
+    Immutable report record built straight from a reports row
+    
+    Fields are readable as attributes (report.waste_type, also from Jinja)
+    or by name like a dict (report['waste_type'], report.get(...)), so one
+    tuple per row replaces the per-row dict copy. distance_m is only set by
+    proximity searches.
+    """
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = _FIELD_INDEX[key]
+        return tuple.__getitem__(self, key)
+    
+    def get(self, key, default=None):
+        """dict.get() equivalent for field names"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self):
+        """Field names, so dict(report) works"""
+        return REPORT_FIELDS if self.distance_m is None else self._fields
+    
+    def to_dict(self, fields=None):
+        """
+        Convert to a plain dictionary (e.g. for JSON responses)
+        
+        Args:
+            fields: Optional iterable of field names to include
+        
+        Returns:
+            dict: Field name -> value
+        """
+        return {field: self[field] for field in (fields or self.keys())}
+
+_FIELD_INDEX = {field: index for index, field in enumerate(Report._fields)}
+
+def _report_factory(cursor, row):
+    """sqlite3 row_factory producing Report records from REPORT_COLUMNS selects"""
+    return Report(*row)
+
+def _clamp_limit(limit, maximum=MAX_PAGE_SIZE):
+    """Clamp a requested page size to 1..maximum"""
+    return max(1, min(int(limit or DEFAULT_PAGE_SIZE), maximum))
+
+def _page_query(cursor, direction, limit, waste_type=None, severity=None, report_status=None,
+                date_from=None, date_to=None):
+    """
+    Build the keyset query for one listing page (see ReportStream)
+    
+    One row more than the page size is selected to learn whether another
+    page exists.
+    
+    Returns:
+        tuple: (sql: str, params: tuple, limit: int, position: tuple or None, backwards: bool)
+    """
+    limit = _clamp_limit(limit)
+    position = decode_cursor(cursor)
+    backwards = direction == 'prev' and position is not None
+    
+    conditions, params = _filter_conditions(waste_type, severity, report_status, date_from, date_to)
+    if position:
+        conditions.append('(created_at, id) > (?, ?)' if backwards else '(created_at, id) < (?, ?)')
+        params.extend(position)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    order = 'ASC' if backwards else 'DESC'
+    
+    sql = f'''
+        SELECT {REPORT_COLUMNS}
+        FROM reports
+        {where}
+        ORDER BY created_at {order}, id {order}
+        LIMIT ?
+    '''
+    return sql, (*params, limit + 1), limit, position, backwards
+
+def _page_cursors(first, last, has_more, position, backwards):
+    """
+    Cursors to the neighbouring pages of a non-empty listing page
     
     Args:
-        user_id: User ID from session
-        username: Username from session
-        latitude: Latitude coordinate
-        longitude: Longitude coordinate
-        readable_area: Optional readable location name
-        photo_path: Path to uploaded photo
-        waste_type: Type of waste (Plastic, Organic, etc.)
-        description: Optional description (max 200 chars)
-        severity: Optional severity (Low, Medium, High)
-        landmark: Optional landmark information
+        first: First report on the page (newest)
+        last: Last report on the page (oldest)
+        has_more: Whether rows exist beyond the page in the fetch direction
+        position: Decoded cursor the page was fetched from, if any
+        backwards: Whether the page was fetched towards newer reports
     
     Returns:
-        tuple: (success: bool, message: str, report_id: int or None)
+        tuple: (next_cursor: str or None, prev_cursor: str or None)
+    """
+    if backwards:
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+        prev_cursor = encode_cursor(first['created_at'], first['id']) if has_more else None
+    else:
+        next_cursor = encode_cursor(last['created_at'], last['id']) if has_more else None
+        prev_cursor = encode_cursor(first['created_at'], first['id']) if position else None
+    return next_cursor, prev_cursor
+
+def _filter_conditions(waste_type=None, severity=None, report_status=None,
+                       date_from=None, date_to=None, table=''):
+    """
+    Build WHERE conditions for the listing filters
+    
+    Args:
+        waste_type: Optional waste type filter
+        severity: Optional severity filter
+        report_status: Optional status filter
+        date_from: Optional inclusive start date (YYYY-MM-DD)
+        date_to: Optional inclusive end date (YYYY-MM-DD)
+        table: Optional table alias prefix, e.g. 'r.'
+    
+    Returns:
+        tuple: (conditions: list of SQL fragments, params: list)
+    """
+    conditions = []
+    params = []
+    
+    if waste_type:
+        conditions.append(f'{table}waste_type = ?')
+        params.append(waste_type)
+    if severity:
+        conditions.append(f'{table}severity = ?')
+        params.append(severity)
+    if report_status:
+        conditions.append(f'{table}report_status = ?')
+        params.append(report_status)
+    if date_from:
+        conditions.append(f'{table}created_at >= ?')
+        params.append(date_from)
+    if date_to:
+        conditions.append(f"{table}created_at < date(?, '+1 day')")
+        params.append(date_to)
+    
+    return conditions, params
+
+def _cluster_keys(latitude, longitude, waste_type, severity):
+    """
+    Cluster table keys a report contributes to, one per zoom level
+    
+    Args:
+        latitude: Report latitude
+        longitude: Report longitude
+        waste_type: Report waste type
+        severity: Report severity or None
+    
+    Returns:
+        list: (zoom, cell_x, cell_y, waste_type, severity) tuples
+    """
+    cell_x, cell_y = latlon_to_tile(latitude, longitude, MAX_CLUSTER_ZOOM + CLUSTER_CELL_BITS)
+    return [
+        (zoom, cell_x >> (MAX_CLUSTER_ZOOM - zoom), cell_y >> (MAX_CLUSTER_ZOOM - zoom), waste_type, severity or '')
+        for zoom in range(MAX_CLUSTER_ZOOM + 1)
+    ]
+
+def _update_clusters(cursor, latitude, longitude, waste_type, severity, delta):
+    """
+    Add (delta=1) or remove (delta=-1) one open report from the cluster aggregates
+    
+    Runs on the caller's cursor so it commits together with the report change.
+    """
+    keys = _cluster_keys(latitude, longitude, waste_type, severity)
+    
+    cursor.executemany('''
+        INSERT INTO report_clusters (zoom, cell_x, cell_y, waste_type, severity,
+                                     report_count, lat_sum, lon_sum)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (zoom, cell_x, cell_y, waste_type, severity) DO UPDATE SET
+            report_count = report_count + excluded.report_count,
+            lat_sum = lat_sum + excluded.lat_sum,
+            lon_sum = lon_sum + excluded.lon_sum
+    ''', [(*key, delta, latitude * delta, longitude * delta) for key in keys])
+    
+    if delta < 0:
+        cursor.executemany('''
+            DELETE FROM report_clusters
+            WHERE zoom = ? AND cell_x = ? AND cell_y = ? AND waste_type = ? AND severity = ?
+              AND report_count <= 0
+        ''', keys)
+
+def _update_clusters_bulk(cursor, reports):
+    """
+    Add many new open reports to the cluster aggregates
+    
+    Args:
+        cursor: Cursor inside the caller's transaction
+        reports: List of (latitude, longitude, waste_type, severity)
+    """
+    totals = {}
+    for latitude, longitude, waste_type, severity in reports:
+        for key in _cluster_keys(latitude, longitude, waste_type, severity):
+            total = totals.get(key)
+            if total is None:
+                totals[key] = [1, latitude, longitude]
+            else:
+                total[0] += 1
+                total[1] += latitude
+                total[2] += longitude
+    
+    cursor.executemany('''
+        INSERT INTO report_clusters (zoom, cell_x, cell_y, waste_type, severity,
+                                     report_count, lat_sum, lon_sum)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (zoom, cell_x, cell_y, waste_type, severity) DO UPDATE SET
+            report_count = report_count + excluded.report_count,
+            lat_sum = lat_sum + excluded.lat_sum,
+            lon_sum = lon_sum + excluded.lon_sum
+    ''', [(*key, *total) for key, total in totals.items()])
+
+def _cluster_tile_key(zoom, x, y):
+    """Cache key of a cluster tile in the current clusters generation"""
+    generation = get_cache().counter('gen:clusters')
+    return f"clusters:{generation}:{zoom}:{x}:{y}"
+
+def _invalidate_cluster_tiles(latitude, longitude):
+    """Drop cached cluster tiles that contain a coordinate"""
+    cache = get_cache()
+    for zoom in range(MAX_CLUSTER_ZOOM + 1):
+        cache.delete(_cluster_tile_key(zoom, *latlon_to_tile(latitude, longitude, zoom)))
+
+def _invalidate_report_caches():
+    """Retire every cached report listing and wake change-feed listeners after a write"""
+    invalidate('reports')
+    with _report_changes:
+        _report_changes.notify_all()
+
+def encode_cursor(created_at, report_id):
+    """
+    Encode a (created_at, id) position as an opaque page cursor
+    
+    Args:
+        created_at: created_at value of the boundary report
+        report_id: ID of the boundary report
+    
+    Returns:
+        str: URL-safe cursor token
+    """
+    raw = f"{created_at}|{report_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token):
+    """
+    Decode a page cursor produced by encode_cursor
+    
+    Args:
+        token: Cursor token
+    
+    Returns:
+        tuple or None: (created_at, report_id) if valid, None otherwise
+    """
+    if not token:
+        return None
+    
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, report_id = base64.urlsafe_b64decode(padded).decode().rsplit('|', 1)
+        return created_at, int(report_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def _validate_report(user_id, latitude, longitude, photo_path, waste_type, description=None, severity=None):
+    """
+    Check report fields before insert
+    
+    Returns:
+        str or None: Error message, None if the report is valid
     """
     # Validate required inputs
     if not all([user_id, latitude, longitude, photo_path, waste_type]):
-        return False, "Missing required fields", None
+        return "Missing required fields"
     
     # Validate waste_type
     valid_waste_types = ['Plastic', 'Organic', 'Construction debris', 'E-waste', 'Mixed / Other']
     if waste_type not in valid_waste_types:
-        return False, f"Invalid waste type. Must be one of: {', '.join(valid_waste_types)}", None
+        return f"Invalid waste type. Must be one of: {', '.join(valid_waste_types)}"
+    
+    # Validate coordinates
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return "Coordinates out of range"
     
     # Validate description length
     if description and len(description) > 200:
-        return False, "Description must be 200 characters or less", None
+        return "Description must be 200 characters or less"
     
     # Validate severity if provided
     if severity and severity not in ['Low', 'Medium', 'High']:
-        return False, "Invalid severity. Must be Low, Medium, or High", None
+        return "Invalid severity. Must be Low, Medium, or High"
+    
+    return None
+
+def _find_duplicate(cursor, latitude, longitude, waste_type, photo_path):
+    """
+    Find an open report of the same waste type close in space and time
+    
+    Candidates come from the spatial index (CROSS JOIN pins it as the
+    driving table), so this stays a handful of row lookups regardless of
+    table size. A candidate with the identical stored
+    photo wins, otherwise the nearest one does.
+    
+    Returns:
+        int or None: ID of the report to merge into
+    """
+    min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, DUPLICATE_RADIUS_M)
+    
+    cursor.execute('''
+        SELECT r.id, r.latitude, r.longitude, r.photo_path
+        FROM reports_rtree AS t
+        CROSS JOIN reports AS r ON r.id = t.id
+        WHERE t.min_lat <= ? AND t.max_lat >= ?
+          AND t.min_lon <= ? AND t.max_lon >= ?
+          AND r.waste_type = ?
+          AND r.report_status != 'Cleaned'
+          AND r.created_at >= datetime('now', ?)
+    ''', (max_lat, min_lat, max_lon, min_lon, waste_type, f'-{DUPLICATE_WINDOW_HOURS} hours'))
+    
+    best = None
+    for report_id, report_lat, report_lon, report_photo in cursor.fetchall():
+        distance = haversine_m(latitude, longitude, report_lat, report_lon)
+        if distance > DUPLICATE_RADIUS_M:
+            continue
+        rank = (report_photo != photo_path, distance)
+        if best is None or rank < best[0]:
+            best = (rank, report_id)
+    
+    return best[1] if best else None
+
+@timed
+def create_report(user_id, username, latitude, longitude, readable_area, photo_path, waste_type, description=None, severity=None, landmark=None, dedupe=True):
+    """
+    Create a new waste report
+    
+    If dedupe is set and an open report of the same waste type exists within
+    DUPLICATE_RADIUS_M and DUPLICATE_WINDOW_HOURS, the submission is linked
+    to that report instead of creating a new one, and REPORT_MERGED_MESSAGE
+    is returned with the existing report's ID.
+    
+    Args:
+        user_id: User ID from session
+        username: Username from session
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        readable_area: Optional readable location name
+        photo_path: Path to uploaded photo
+        waste_type: Type of waste (Plastic, Organic, etc.)
+        description: Optional description (max 200 chars)
+        severity: Optional severity (Low, Medium, High)
+        landmark: Optional landmark information
+        dedupe: Merge into a nearby recent report of the same type
+    
+    Returns:
+        tuple: (success: bool, message: str, report_id: int or None)
+    """
+    error = _validate_report(user_id, latitude, longitude, photo_path, waste_type, description, severity)
+    if error:
+        return False, error, None
     
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
+        if dedupe:
+            # Hold the write lock across check and insert so concurrent
+            # submissions of the same pile can't both miss each other
+            cursor.execute('BEGIN IMMEDIATE')
+            duplicate_id = _find_duplicate(cursor, latitude, longitude, waste_type, photo_path)
+            
+            if duplicate_id is not None:
+                cursor.execute('''
+                    INSERT INTO report_duplicates (report_id, user_id, photo_path)
+                    VALUES (?, ?, ?)
+                ''', (duplicate_id, user_id, photo_path))
+                cursor.execute('''
+                    UPDATE reports
+                    SET duplicate_count = duplicate_count + 1
+                    WHERE id = ?
+                ''', (duplicate_id,))
+                conn.commit()
+                _invalidate_report_caches()
+                return True, REPORT_MERGED_MESSAGE, duplicate_id
+        
         # Insert new report (status defaults to 'Pending')
         cursor.execute('''
-            INSERT INTO reports (user_id, username, latitude, longitude, readable_area, 
+            INSERT INTO reports (user_id, username, latitude, longitude, readable_area,
                                photo_path, waste_type, description, severity, landmark)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, username, latitude, longitude, readable_area, photo_path, 
+        ''', (user_id, username, latitude, longitude, readable_area, photo_path,
               waste_type, description, severity, landmark))
         
         report_id = cursor.lastrowid
+        _update_clusters(cursor, latitude, longitude, waste_type, severity, 1)
         conn.commit()
-        conn.close()
         
+        _invalidate_report_caches()
+        _invalidate_cluster_tiles(latitude, longitude)
         return True, "Report created successfully!", report_id
     
     except sqlite3.Error as e:
-        conn.close()
+        conn.rollback()
         return False, f"Database error: {str(e)}", None
 
+def _bulk_row(report):
+    """
+    Validate one create_reports_bulk record and build its insert row
+    
+    Returns:
+        tuple: (row: tuple or None, error: str or None)
+    """
+    try:
+        latitude = float(report.get('latitude'))
+        longitude = float(report.get('longitude'))
+    except (TypeError, ValueError):
+        return None, "Invalid coordinates"
+    
+    waste_type = report.get('waste_type')
+    severity = report.get('severity') or None
+    description = report.get('description') or None
+    
+    error = _validate_report(report.get('user_id'), latitude, longitude, report.get('photo_path'),
+                             waste_type, description, severity)
+    if error:
+        return None, error
+    
+    return (report['user_id'], report.get('username'), latitude, longitude,
+            report.get('readable_area') or None, report['photo_path'], waste_type,
+            description, severity, report.get('landmark') or None), None
+
+def validate_bulk_report(report):
+    """
+    Check a record as create_reports_bulk would, without inserting it
+    
+    Args:
+        report: Dictionary with create_report's keyword arguments
+    
+    Returns:
+        str or None: Error message, None if the record would be imported
+    """
+    return _bulk_row(report)[1]
+
+@timed
+def create_reports_bulk(reports):
+    """
+    Validate and insert many reports in a single transaction
+    
+    Invalid reports are skipped and reported back rather than failing the
+    batch. Bulk imports are not deduplicated against existing reports.
+    
+    Args:
+        reports: List of dictionaries with create_report's keyword arguments
+                 (user_id, username, latitude, longitude, readable_area,
+                 photo_path, waste_type, description, severity, landmark)
+    
+    Returns:
+        tuple: (success: bool, message: str, report_ids: list, errors: list of (index, message))
+    """
+    rows = []
+    errors = []
+    
+    for index, report in enumerate(reports):
+        row, error = _bulk_row(report)
+        if error:
+            errors.append((index, error))
+            continue
+        rows.append(row)
+    
+    if not rows:
+        return True, "No valid reports to import", [], errors
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # The write lock keeps the new IDs contiguous after the current maximum
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM reports')
+        last_id = cursor.fetchone()[0]
+        
+        cursor.executemany('''
+            INSERT INTO reports (user_id, username, latitude, longitude, readable_area,
+                               photo_path, waste_type, description, severity, landmark)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        
+        cursor.execute('SELECT id FROM reports WHERE id > ? ORDER BY id', (last_id,))
+        report_ids = [row[0] for row in cursor.fetchall()]
+        
+        _update_clusters_bulk(cursor, [(row[2], row[3], row[6], row[8]) for row in rows])
+        conn.commit()
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return False, f"Database error: {str(e)}", [], errors
+    
+    _invalidate_report_caches()
+    invalidate('clusters')
+    return True, f"Imported {len(report_ids)} reports", report_ids, errors
+
+@cached('reports')
 def get_reports_by_user(user_id):
     """
     Get all reports for a specific user
     
+    The list form of iter_reports_by_user, cached whatever its length.
+    
     Args:
         user_id: User ID
     
     Returns:
-        list: List of report dictionaries
+        list: List of Report records, newest first
+    """
+    return list(iter_reports_by_user.uncached(user_id))
+
+@cached_iter('reports', max_items=MAX_CACHED_STREAM_ROWS)
+@timed
+def iter_reports_by_user(user_id):
+    """
+    Stream a user's reports, newest first, one Report record at a time
+    
+    Histories of up to MAX_CACHED_STREAM_ROWS reports are cached, so a
+    repeated dashboard view is served from memory; longer ones stream
+    from the database every time.
+    
+    Args:
+        user_id: User's ID
+    
+    Yields:
+        Report: The user's reports
     """
     conn = get_db_connection()
     cursor = conn.cursor()
+    cursor.row_factory = _report_factory
     
     try:
-        cursor.execute('''
-            SELECT id, user_id, username, latitude, longitude, readable_area,
-                   photo_path, waste_type, date_time, description, severity,
-                   landmark, report_status, created_at
+        cursor.execute(f'''
+            SELECT {REPORT_COLUMNS}
             FROM reports
             WHERE user_id = ?
             ORDER BY created_at DESC
         ''', (user_id,))
         
-        reports = []
-        for row in cursor.fetchall():
-            reports.append({
-                'id': row['id'],
-                'user_id': row['user_id'],
-                'username': row['username'],
-                'latitude': row['latitude'],
-                'longitude': row['longitude'],
-                'readable_area': row['readable_area'],
-                'photo_path': row['photo_path'],
-                'waste_type': row['waste_type'],
-                'date_time': row['date_time'],
-                'description': row['description'],
-                'severity': row['severity'],
-                'landmark': row['landmark'],
-                'report_status': row['report_status'],
-                'created_at': row['created_at']
-            })
-        
-        conn.close()
-        return reports
+        yield from cursor
     
     except sqlite3.Error as e:
-        conn.close()
-        return []
+        print(f"Report stream aborted: {e}")
+        dont_cache()
+    
+    finally:
+        cursor.close()
 
+@cached('reports')
+@timed
 def get_all_reports():
     """
     Get all reports (for admin view)
     
     Returns:
-        list: List of all report dictionaries
+        list: List of all Report records
     """
     conn = get_db_connection()
     cursor = conn.cursor()
+    cursor.row_factory = _report_factory
     
     try:
-        cursor.execute('''
-            SELECT id, user_id, username, latitude, longitude, readable_area,
-                   photo_path, waste_type, date_time, description, severity,
-                   landmark, report_status, created_at
+        cursor.execute(f'''
+            SELECT {REPORT_COLUMNS}
             FROM reports
             ORDER BY created_at DESC
         ''')
         
-        reports = []
-        for row in cursor.fetchall():
-            reports.append({
-                'id': row['id'],
-                'user_id': row['user_id'],
-                'username': row['username'],
-                'latitude': row['latitude'],
-                'longitude': row['longitude'],
-                'readable_area': row['readable_area'],
-                'photo_path': row['photo_path'],
-                'waste_type': row['waste_type'],
-                'date_time': row['date_time'],
-                'description': row['description'],
-                'severity': row['severity'],
-                'landmark': row['landmark'],
-                'report_status': row['report_status'],
-                'created_at': row['created_at']
-            })
+        reports = cursor.fetchall()
         
-        conn.close()
         return reports
     
     except sqlite3.Error as e:
-        conn.close()
+        conn.rollback()
+        dont_cache()
         return []
 
-def update_report_status(report_id, status):
+# Last item of a _stream_page sequence
+_PageCursors = namedtuple('_PageCursors', ('next_cursor', 'prev_cursor'))
+
+@cached_iter('reports')
+@timed
+def _stream_page(cursor, direction, limit, **filters):
     """
-    Update the status of a report
-    
-    Args:
-        report_id: Report ID
-        status: New status (Pending, In Progress, Cleaned)
+    Reports of one listing page, then the page's _PageCursors
     
-    Returns:
-        tuple: (success: bool, message: str)
+    Cached as a whole (a page is at most MAX_PAGE_SIZE rows), so repeated
+    page views are replayed from memory and only a miss reads the database.
     """
-    valid_statuses = ['Pending', 'In Progress', 'Cleaned']
-    if status not in valid_statuses:
-        return False, f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+    sql, params, limit, position, backwards = _page_query(cursor, direction, limit, **filters)
     
     conn = get_db_connection()
-    cursor = conn.cursor()
+    db_cursor = conn.cursor()
+    db_cursor.row_factory = _report_factory
     
     try:
-        cursor.execute('''
-            UPDATE reports
-            SET report_status = ?
-            WHERE id = ?
-        ''', (status, report_id))
-        
-        if cursor.rowcount == 0:
-            conn.close()
-            return False, "Report not found"
+        db_cursor.execute(sql, params)
+        has_more = False
+        if backwards:
+            # Newer pages are read oldest first - at most limit + 1 rows to reverse
+            rows = db_cursor.fetchall()
+            has_more = len(rows) > limit
+            rows = reversed(rows[:limit])
+        else:
+            rows = db_cursor
         
-        conn.commit()
-        conn.close()
-        return True, "Report status updated successfully"
+        first = last = None
+        for count, report in enumerate(rows):
+            if count == limit:
+                has_more = True
+                break
+            if first is None:
+                first = report
+            last = report
+            yield report
     
     except sqlite3.Error as e:
-        conn.close()
-        return False, f"Database error: {str(e)}"
+        print(f"Report stream aborted: {e}")
+        dont_cache()
+        return
+    
+    finally:
+        db_cursor.close()
+    
+    if first is None:
+        yield _PageCursors(None, None)
+    else:
+        yield _PageCursors(*_page_cursors(first, last, has_more, position, backwards))
 
-def get_report_by_id(report_id):
+class ReportStream:
     """
-    Get a single report by ID
+    One page of reports, newest first, fetched lazily while iterated
     
-    Args:
-        report_id: Report ID
+    Pages are addressed by a cursor on (created_at, id) rather than an
+    offset, so fetching any page costs the same however deep it is.
+    Iterating yields Report records as their rows are read (or replayed
+    from the cache), so a streamed template can send each card straight
+    away. next_cursor and prev_cursor are only known once iteration has
+    finished.
+    """
+    
+    def __init__(self, cursor=None, direction='next', limit=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Args:
+            cursor: Optional cursor token from a previous page
+            direction: 'next' for older reports, 'prev' for newer reports
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            **filters: Optional waste_type, severity, report_status, and
+                date_from / date_to (inclusive, YYYY-MM-DD) filters
+        """
+        self._args = (cursor, direction, limit)
+        self._filters = filters
+        self.next_cursor = None
+        self.prev_cursor = None
+    
+    def __iter__(self):
+        for item in _stream_page(*self._args, **self._filters):
+            if isinstance(item, _PageCursors):
+                self.next_cursor, self.prev_cursor = item
+            else:
+                yield item
+
+def get_reports_page(cursor=None, direction='next', limit=DEFAULT_PAGE_SIZE, **filters):
+    """
+    Get one page of reports, newest first, as a list
+    
+    Reads a ReportStream to the end, so it shares ReportStream's cached
+    pages.
+    
+    Args:
+        cursor: Optional cursor token from a previous page
+        direction: 'next' for older reports, 'prev' for newer reports
+        limit: Page size (capped at MAX_PAGE_SIZE)
+        **filters: Optional listing filters (see ReportStream)
+    
+    Returns:
+        tuple: (reports: list, next_cursor: str or None, prev_cursor: str or None)
+    """
+    stream = ReportStream(cursor, direction, limit, **filters)
+    reports = list(stream)
+    return reports, stream.next_cursor, stream.prev_cursor
+
+@timed
+def iter_reports(cursor=None, limit=DEFAULT_PAGE_SIZE, fields=REPORT_FIELDS, **filters):
+    """
+    Stream one page of reports, newest first, straight from the database cursor
+    
+    Rows are converted and yielded one at a time, so a page is never held in
+    memory. Paging works like ReportStream (next direction only): the
+    last report of a page that has more after it carries the next cursor.
+    
+    Args:
+        cursor: Optional cursor token from a previous page
+        limit: Page size (capped at MAX_STREAM_PAGE_SIZE)
+        fields: Report fields to return (subset of REPORT_FIELDS)
+        **filters: Optional listing filters (see ReportStream)
+    
+    Yields:
+        tuple: (report: dict of the requested fields, next_cursor: str or None)
+    """
+    limit = _clamp_limit(limit, MAX_STREAM_PAGE_SIZE)
+    position = decode_cursor(cursor)
+    
+    conditions, params = _filter_conditions(**filters)
+    if position:
+        conditions.append('(created_at, id) < (?, ?)')
+        params.extend(position)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
+    conn = get_db_connection()
+    db_cursor = conn.cursor()
+    
+    try:
+        # created_at and id lead every row for the cursor; one extra row tells
+        # whether another page exists
+        db_cursor.execute(f'''
+            SELECT created_at, id, {', '.join(fields)}
+            FROM reports
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        ''', (*params, limit + 1))
+        
+        pending = None
+        for index, row in enumerate(db_cursor):
+            if index == limit:
+                yield pending[2], encode_cursor(pending[0], pending[1])
+                return
+            if pending is not None:
+                yield pending[2], None
+            pending = (row[0], row[1], dict(zip(fields, row[2:])))
+        
+        if pending is not None:
+            yield pending[2], None
+    
+    except sqlite3.Error as e:
+        print(f"Report stream aborted: {e}")
+    
+    finally:
+        db_cursor.close()
+
+@timed
+def get_reports_version():
+    """
+    Highest change sequence number - it moves whenever any report is written
+    
+    Returns:
+        int: Current change sequence, 0 for an empty table
+    """
+    conn = get_db_connection()
+    
+    try:
+        row = conn.execute('SELECT MAX(change_seq) FROM reports').fetchone()
+        return row[0] or 0
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return 0
+
+@timed
+def iter_report_batches(since_id=0, batch_size=1000, fields=REPORT_FIELDS, **filters):
+    """
+    Read every matching report in ID order, one batch at a time
+    
+    Each batch is a separate keyset query on the primary key, so memory
+    and read transactions stay short however large the table is.
+    Database errors are raised rather than ending the export early.
+    
+    Args:
+        since_id: Only reports with a higher ID
+        batch_size: Rows per batch
+        fields: Report fields to read, starting with 'id'
+        **filters: Optional listing filters (see ReportStream)
+    
+    Yields:
+        list: Row tuples in fields order
+    """
+    conditions, params = _filter_conditions(**filters)
+    conditions.append('id > ?')
+    where = ' AND '.join(conditions)
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    
+    last_id = since_id or 0
+    while True:
+        cursor.execute(f'''
+            SELECT {', '.join(fields)}
+            FROM reports
+            WHERE {where}
+            ORDER BY id
+            LIMIT ?
+        ''', (*params, last_id, batch_size))
+        
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        yield rows
+        
+        last_id = rows[-1][0]
+
+@timed
+def get_report_changes(since=0, limit=MAX_PAGE_SIZE):
+    """
+    Reports created or updated after a change sequence number, oldest change first
+    
+    Each write moves a report to the end of the change sequence, so a
+    client that remembers the last change_seq it saw fetches only the delta
+    through the change_seq index.
+    
+    Args:
+        since: Last change_seq the client has seen (0 for everything)
+        limit: Maximum number of reports (capped at MAX_STREAM_PAGE_SIZE)
     
     Returns:
-        dict or None: Report data if found, None otherwise
+        list: List of Report records ordered by change_seq
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = _report_factory
+    
+    try:
+        cursor.execute(f'''
+            SELECT {REPORT_COLUMNS}
+            FROM reports
+            WHERE change_seq > ?
+            ORDER BY change_seq
+            LIMIT ?
+        ''', (since, _clamp_limit(limit, MAX_STREAM_PAGE_SIZE)))
+        
+        return cursor.fetchall()
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return []
+
+def wait_for_report_changes(since, timeout):
+    """
+    Block until a report changes after since, or until timeout passes
+    
+    Writes from this process wake waiters immediately; writes from other
+    processes are seen when the timeout expires.
+    
+    Args:
+        since: Last change_seq the caller has seen
+        timeout: Seconds to wait at most
+    
+    Returns:
+        bool: True if there are changes after since
+    """
+    if get_reports_version() > since:
+        return True
+    with _report_changes:
+        _report_changes.wait(timeout)
+    return get_reports_version() > since
+
+@timed
+def get_reports_in_bbox(min_lat, min_lon, max_lat, max_lon, limit=MAX_PAGE_SIZE, open_only=False, **filters):
+    """
+    Get reports inside a bounding box using the spatial index
+    
+    Args:
+        min_lat: Southern edge latitude
+        min_lon: Western edge longitude
+        max_lat: Northern edge latitude
+        max_lon: Eastern edge longitude
+        limit: Maximum number of reports (capped at MAX_PAGE_SIZE)
+        open_only: Leave out Cleaned reports, like the cluster aggregates do
+        **filters: Optional listing filters (see ReportStream)
+    
+    Returns:
+        list: List of Report records, newest first
+    """
+    conditions, params = _filter_conditions(table='r.', **filters)
+    conditions.append('r.latitude BETWEEN ? AND ?')
+    conditions.append('r.longitude BETWEEN ? AND ?')
+    params.extend([min_lat, max_lat, min_lon, max_lon])
+    if open_only:
+        conditions.append("r.report_status != 'Cleaned'")
+    where = ' AND '.join(conditions)
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = _report_factory
+    
+    try:
+        cursor.execute(f'''
+            SELECT {REPORT_COLUMNS_ALIASED}
+            FROM reports_rtree AS t
+            CROSS JOIN reports AS r ON r.id = t.id
+            WHERE t.min_lat <= ? AND t.max_lat >= ?
+              AND t.min_lon <= ? AND t.max_lon >= ?
+              AND {where}
+            ORDER BY r.created_at DESC, r.id DESC
+            LIMIT ?
+        ''', (max_lat, min_lat, max_lon, min_lon, *params, _clamp_limit(limit)))
+        
+        reports = cursor.fetchall()
+        
+        return reports
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return []
+
+@timed
+def get_reports_near(latitude, longitude, radius_m=DEFAULT_NEAR_RADIUS_M, limit=MAX_PAGE_SIZE, **filters):
+    """
+    Get reports within radius_m of a coordinate, nearest first
+    
+    Searches rings of growing radius (see NEAR_RING_GROWTH). Each ring is a
+    spatial index query on its bounding box that ranks rows by approximate
+    (equirectangular) distance in SQL and reads at most limit of them. Once
+    limit reports lie inside a ring, nothing outside it can be nearer, so
+    the search stops there.
+    
+    Args:
+        latitude: Center latitude
+        longitude: Center longitude
+        radius_m: Search radius in meters (capped at MAX_NEAR_RADIUS_M)
+        limit: Maximum number of reports (capped at MAX_PAGE_SIZE)
+        **filters: Optional listing filters (see ReportStream)
+    
+    Returns:
+        list: List of Report records with distance_m set
+    """
+    radius_m = max(1, min(float(radius_m), MAX_NEAR_RADIUS_M))
+    limit = _clamp_limit(limit)
+    
+    conditions, params = _filter_conditions(table='r.', **filters)
+    where = ''.join(f' AND {condition}' for condition in conditions)
+    
+    # Degrees of longitude shrink with latitude; squared to scale squared distances
+    lon_scale = math.cos(math.radians(latitude)) ** 2
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = _report_factory
+    
+    ring_m = min(radius_m, NEAR_FIRST_RING_M)
+    try:
+        while True:
+            min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, ring_m)
+            cursor.execute(f'''
+                SELECT {REPORT_COLUMNS_ALIASED}
+                FROM reports_rtree AS t
+                CROSS JOIN reports AS r ON r.id = t.id
+                WHERE t.min_lat <= ? AND t.max_lat >= ?
+                  AND t.min_lon <= ? AND t.max_lon >= ?{where}
+                ORDER BY (r.latitude - ?) * (r.latitude - ?)
+                         + (r.longitude - ?) * (r.longitude - ?) * ?
+                LIMIT ?
+            ''', (max_lat, min_lat, max_lon, min_lon, *params,
+                  latitude, latitude, longitude, longitude, lon_scale, limit))
+            
+            reports = []
+            for report in cursor:
+                distance = haversine_m(latitude, longitude, report.latitude, report.longitude)
+                if distance <= ring_m:
+                    reports.append(report._replace(distance_m=distance))
+            
+            if len(reports) >= limit or ring_m >= radius_m:
+                break
+            ring_m = min(radius_m, ring_m * NEAR_RING_GROWTH)
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return []
+    
+    reports.sort(key=lambda report: report.distance_m)
+    return reports
+
+def _search_expression(query):
+    """
+    Turn free text into a safe FTS5 query
+    
+    Words are quoted so FTS5 operators typed by users (NEAR, OR, quotes,
+    hyphens) are searched for literally. Every word must match and the last
+    one also matches as a prefix, so partly typed street names still hit.
+    
+    Args:
+        query: Search box text
+    
+    Returns:
+        str or None: FTS5 MATCH expression, None if the text has no words
+    """
+    terms = re.findall(r'\w+', query or '')[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+@cached('reports')
+@timed
+def search_reports(query, cursor=None, limit=DEFAULT_PAGE_SIZE, **filters):
+    """
+    Full-text search over report descriptions, landmarks, areas and usernames
+    
+    Matches come from the FTS5 index and are ranked by bm25, best first.
+    Pages are keyed on (rank, id); ranks shift slightly as reports are
+    added, so a report may occasionally repeat or drop between pages.
+    
+    Args:
+        query: Search text, e.g. 'near market'
+        cursor: Optional cursor token from a previous page of this search
+        limit: Page size (capped at MAX_PAGE_SIZE)
+        **filters: Optional listing filters (see ReportStream)
+    
+    Returns:
+        tuple: (reports: list of Report records, next_cursor: str or None)
+    """
+    expression = _search_expression(query)
+    if expression is None:
+        return [], None
+    
+    limit = _clamp_limit(limit)
+    conditions, params = _filter_conditions(table='r.', **filters)
+    
+    position = decode_cursor(cursor)
+    try:
+        after = (float(position[0]), position[1]) if position else None
+    except ValueError:
+        after = None  # not a search cursor
+    if after:
+        conditions.append('(f.rank, r.id) > (?, ?)')
+        params.extend(after)
+    where = ''.join(f' AND {condition}' for condition in conditions)
+    
+    conn = get_db_connection()
+    db_cursor = conn.cursor()
+    
+    try:
+        rows = db_cursor.execute(f'''
+            SELECT f.rank, {REPORT_COLUMNS_ALIASED}
+            FROM reports_fts AS f
+            JOIN reports AS r ON r.id = f.rowid
+            WHERE reports_fts MATCH ?{where}
+            ORDER BY f.rank, r.id
+            LIMIT ?
+        ''', (expression, *params, limit + 1)).fetchall()
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        dont_cache()
+        return [], None
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0], rows[-1][1])
+    
+    return [Report(*row[1:]) for row in rows], next_cursor
+
+def _rebuild_clusters(cursor):
+    """
+    Recompute the cluster aggregates on the caller's cursor
+    
+    Returns:
+        int: Number of cluster cells written
+    """
+    cursor.execute('DELETE FROM report_clusters')
+    
+    # Stream open reports through a second cursor on the same connection
+    open_reports = cursor.connection.execute('''
+        SELECT latitude, longitude, waste_type, severity
+        FROM reports
+        WHERE report_status != 'Cleaned'
+    ''')
+    _update_clusters_bulk(cursor, open_reports)
+    
+    invalidate('clusters')
+    cursor.execute('SELECT COUNT(*) FROM report_clusters')
+    return cursor.fetchone()[0]
+
+@timed
+def rebuild_report_clusters():
+    """
+    Recompute the cluster aggregates from the reports table
+    
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cell_count = _rebuild_clusters(cursor)
+        conn.commit()
+        return True, f"Rebuilt {cell_count} cluster cells"
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return False, f"Database error: {str(e)}"
+
+@timed
+def rebuild_report_stats():
+    """
+    Recompute the summary statistics from the reports table
+    
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        row_count = _rebuild_stats(cursor)
+        conn.commit()
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return False, f"Database error: {str(e)}"
+    
+    _invalidate_report_caches()
+    return True, f"Rebuilt {row_count} statistics rows"
+
+@cached('reports')
+@timed
+def get_report_stats(date_from=None, date_to=None, top_areas=STATS_TOP_AREAS):
+    """
+    Report counts from the summary table, without scanning reports
+    
+    Args:
+        date_from: Optional first day (YYYY-MM-DD) of the daily counts
+        date_to: Optional last day (YYYY-MM-DD); defaults to today, and the
+                 range to the last STATS_DEFAULT_DAYS days
+        top_areas: Number of busiest areas to include
+    
+    Returns:
+        dict: total, counts per waste_type, severity and status, the busiest
+              areas as [{'area', 'count'}] and counts per day, or None on error
+    """
+    date_to = date_to or datetime.utcnow().strftime('%Y-%m-%d')
+    date_from = date_from or (datetime.strptime(date_to, '%Y-%m-%d')
+                              - timedelta(days=STATS_DEFAULT_DAYS - 1)).strftime('%Y-%m-%d')
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        stats = {'waste_type': {}, 'severity': {}, 'status': {}}
+        cursor.execute('''
+            SELECT dimension, value, report_count
+            FROM report_stats
+            WHERE dimension IN ('waste_type', 'severity', 'status') AND report_count > 0
+        ''')
+        for dimension, value, count in cursor.fetchall():
+            stats[dimension][value or 'Unspecified'] = count
+        stats['total'] = sum(stats['status'].values())
+        
+        cursor.execute('''
+            SELECT value, report_count
+            FROM report_stats
+            WHERE dimension = 'area' AND value != '' AND report_count > 0
+            ORDER BY report_count DESC
+            LIMIT ?
+        ''', (top_areas,))
+        stats['areas'] = [{'area': area, 'count': count} for area, count in cursor.fetchall()]
+        
+        cursor.execute('''
+            SELECT value, report_count
+            FROM report_stats
+            WHERE dimension = 'day' AND value BETWEEN ? AND ? AND report_count > 0
+            ORDER BY value
+        ''', (date_from, date_to))
+        stats['days'] = dict(cursor.fetchall())
+        
+        return stats
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        dont_cache()
+        return None
+
+@timed
+def get_cluster_tile(zoom, x, y):
+    """
+    Get aggregated open-report clusters for one Web Mercator map tile
+    
+    Each cluster is one grid cell with its report count, centroid and
+    breakdowns by waste type and severity. Results are cached per tile.
+    
+    Args:
+        zoom: Tile zoom level (0..MAX_CLUSTER_ZOOM)
+        x: Tile column
+        y: Tile row
+    
+    Returns:
+        list or None: List of cluster dictionaries, None if the tile is invalid
+    """
+    if not 0 <= zoom <= MAX_CLUSTER_ZOOM or not (0 <= x < (1 << zoom) and 0 <= y < (1 << zoom)):
+        return None
+    
+    cache = get_cache()
+    key = _cluster_tile_key(zoom, x, y)
+    clusters = cache.get(key)
+    record('clusters', clusters is not None)
+    if clusters is not None:
+        return clusters
+    
+    cells_per_tile = 1 << CLUSTER_CELL_BITS
+    min_x, min_y = x * cells_per_tile, y * cells_per_tile
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+            SELECT cell_x, cell_y, waste_type, severity, report_count, lat_sum, lon_sum
+            FROM report_clusters
+            WHERE zoom = ? AND cell_x BETWEEN ? AND ? AND cell_y BETWEEN ? AND ?
+              AND report_count > 0
+        ''', (zoom, min_x, min_x + cells_per_tile - 1, min_y, min_y + cells_per_tile - 1))
+        
+        rows = cursor.fetchall()
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return []
+    
+    cells = {}
+    for row in rows:
+        cell = cells.setdefault((row['cell_x'], row['cell_y']), {
+            'count': 0, 'lat_sum': 0.0, 'lon_sum': 0.0, 'waste_types': {}, 'severities': {}
+        })
+        count = row['report_count']
+        severity = row['severity'] or 'Unspecified'
+        cell['count'] += count
+        cell['lat_sum'] += row['lat_sum']
+        cell['lon_sum'] += row['lon_sum']
+        cell['waste_types'][row['waste_type']] = cell['waste_types'].get(row['waste_type'], 0) + count
+        cell['severities'][severity] = cell['severities'].get(severity, 0) + count
+    
+    clusters = [
+        {
+            'latitude': cell['lat_sum'] / cell['count'],
+            'longitude': cell['lon_sum'] / cell['count'],
+            'count': cell['count'],
+            'waste_types': cell['waste_types'],
+            'severities': cell['severities']
+        }
+        for cell in cells.values()
+    ]
+    
+    cache.set(key, clusters, CLUSTER_CACHE_TTL)
+    return clusters
+
+@timed
+def update_report_status(report_id, status, actor_id=None):
+    """
+    Update the status of a report
+    
+    Args:
+        report_id: Report ID
+        status: New status (Pending, In Progress, Cleaned)
+        actor_id: Optional ID of the user making the change
+    
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    success, message, updated_ids, missing_ids = update_report_statuses([report_id], status, actor_id)
+    if success and missing_ids:
+        return False, "Report not found"
+    if success and not updated_ids:
+        return True, f"Report is already {status}"
+    return success, message
+
+@timed
+def update_report_statuses(report_ids, status, actor_id=None):
+    """
+    Move many reports to a new status in a single transaction
+    
+    Reports already in that status are left untouched; every real
+    transition is appended to report_status_history and kept in step with
+    the map clusters, which only count open reports.
+    
+    Args:
+        report_ids: Report IDs (at most MAX_STATUS_BATCH)
+        status: New status (Pending, In Progress, Cleaned)
+        actor_id: Optional ID of the user making the change
+    
+    Returns:
+        tuple: (success: bool, message: str, updated_ids: list, missing_ids: list)
+    """
+    valid_statuses = ['Pending', 'In Progress', 'Cleaned']
+    if status not in valid_statuses:
+        return False, f"Invalid status. Must be one of: {', '.join(valid_statuses)}", [], []
+    
+    try:
+        report_ids = list(dict.fromkeys(int(report_id) for report_id in report_ids))
+    except (TypeError, ValueError):
+        return False, "Report IDs must be integers", [], []
+    
+    if not report_ids:
+        return False, "No reports given", [], []
+    if len(report_ids) > MAX_STATUS_BATCH:
+        return False, f"At most {MAX_STATUS_BATCH} reports can be updated at once", [], []
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute(f'''
+            SELECT id, latitude, longitude, waste_type, severity, report_status
+            FROM reports
+            WHERE id IN ({', '.join('?' * len(report_ids))})
+        ''', report_ids)
+        reports = cursor.fetchall()
+        
+        changed = [report for report in reports if report['report_status'] != status]
+        cursor.executemany('UPDATE reports SET report_status = ? WHERE id = ?',
+                           [(status, report['id']) for report in changed])
+        cursor.executemany('''
+            INSERT INTO report_status_history (report_id, old_status, new_status, actor_id)
+            VALUES (?, ?, ?, ?)
+        ''', [(report['id'], report['report_status'], status, actor_id) for report in changed])
+        
+        # Clusters only count open reports
+        is_open = status != 'Cleaned'
+        flipped = [report for report in changed if (report['report_status'] != 'Cleaned') != is_open]
+        for report in flipped:
+            _update_clusters(cursor, report['latitude'], report['longitude'],
+                             report['waste_type'], report['severity'], 1 if is_open else -1)
+        
+        conn.commit()
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return False, f"Database error: {str(e)}", [], []
+    
+    if changed:
+        _invalidate_report_caches()
+    for report in flipped:
+        _invalidate_cluster_tiles(report['latitude'], report['longitude'])
+    
+    found = {report['id'] for report in reports}
+    updated_ids = [report['id'] for report in changed]
+    missing_ids = [report_id for report_id in report_ids if report_id not in found]
+    return True, f"Updated {len(updated_ids)} reports", updated_ids, missing_ids
+
+@timed
+def get_status_history(since=None, after_id=None, report_id=None, limit=MAX_PAGE_SIZE):
+    """
+    Status transitions in the order they happened, (changed_at, id)
+    
+    Sync clients pass the time of their last sync as since, then page on
+    with the last entry's id as after_id. Both are range conditions on the
+    (changed_at, id) index, so a page costs the same however long the
+    history is.
+    
+    Args:
+        since: Optional timestamp ('YYYY-MM-DD HH:MM:SS'); only later changes
+        after_id: Optional history entry ID; only entries after it
+        report_id: Optional report to restrict the history to
+        limit: Maximum number of entries (capped at MAX_STREAM_PAGE_SIZE)
+    
+    Returns:
+        list: History entry dictionaries
+    """
+    conditions, params = [], []
+    if since:
+        conditions.append('changed_at > ?')
+        params.append(since)
+    if after_id:
+        # Resume after that entry's (changed_at, id) position
+        conditions.append('(changed_at, id) > ((SELECT changed_at FROM report_status_history WHERE id = ?), ?)')
+        params.extend((after_id, after_id))
+    if report_id:
+        conditions.append('report_id = ?')
+        params.append(report_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute(f'''
+            SELECT id, report_id, old_status, new_status, actor_id, changed_at
+            FROM report_status_history
+            {where}
+            ORDER BY changed_at, id
+            LIMIT ?
+        ''', (*params, _clamp_limit(limit, MAX_STREAM_PAGE_SIZE)))
+        
+        return [dict(row) for row in cursor.fetchall()]
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return []
+
+@timed
+def set_report_photo_variants(report_id, photo_web_path, photo_thumb_path):
+    """
+    Record the generated photo variants of a report
+    
+    Args:
+        report_id: Report ID
+        photo_web_path: Path to the web-sized photo
+        photo_thumb_path: Path to the thumbnail
+    
+    Returns:
+        tuple: (success: bool, message: str)
     """
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
         cursor.execute('''
-            SELECT id, user_id, username, latitude, longitude, readable_area,
-                   photo_path, waste_type, date_time, description, severity,
-                   landmark, report_status, created_at
+            UPDATE reports
+            SET photo_web_path = ?, photo_thumb_path = ?
+            WHERE id = ?
+        ''', (photo_web_path, photo_thumb_path, report_id))
+        
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return False, "Report not found"
+        
+        conn.commit()
+        _invalidate_report_caches()
+        return True, "Photo variants saved"
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return False, f"Database error: {str(e)}"
+
+@timed
+def iter_reports_without_variants(batch_size=1000):
+    """
+    Reports whose photo has no web/thumbnail variants yet, in ID order
+    
+    Read in keyset batches, so variants can be recorded while iterating.
+    
+    Args:
+        batch_size: Reports read per query
+    
+    Yields:
+        tuple: (report_id, photo_path)
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    last_id = 0
+    
+    while True:
+        cursor.execute('''
+            SELECT id, photo_path
+            FROM reports
+            WHERE id > ? AND (photo_web_path IS NULL OR photo_thumb_path IS NULL)
+            ORDER BY id
+            LIMIT ?
+        ''', (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield from rows
+
+@timed
+def fill_missing_areas(resolve, batch_size=1000, on_batch=None):
+    """
+    Set readable_area on reports that have none, one transaction per batch
+    
+    Reports are walked in ID order, so an interrupted run can simply be
+    started again. Reports resolve() has no name for are left unchanged.
+    
+    Args:
+        resolve: Callable (latitude, longitude) -> area name or None
+        batch_size: Reports examined per batch
+        on_batch: Optional callable receiving (examined, updated) after each batch
+    
+    Returns:
+        tuple: (success: bool, message: str, updated: int)
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    last_id = 0
+    examined = updated = 0
+    
+    try:
+        while True:
+            cursor.execute('''
+                SELECT id, latitude, longitude
+                FROM reports
+                WHERE id > ? AND (readable_area IS NULL OR readable_area = '')
+                ORDER BY id
+                LIMIT ?
+            ''', (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            last_id = rows[-1][0]
+            examined += len(rows)
+            changes = []
+            for report_id, latitude, longitude in rows:
+                area = resolve(latitude, longitude)
+                if area:
+                    changes.append((area, report_id))
+            
+            if changes:
+                cursor.executemany('UPDATE reports SET readable_area = ? WHERE id = ?', changes)
+                conn.commit()
+                updated += len(changes)
+            if on_batch:
+                on_batch(examined, updated)
+    
+    except sqlite3.Error as e:
+        conn.rollback()
+        return False, f"Database error: {str(e)}", updated
+    
+    finally:
+        if updated:
+            _invalidate_report_caches()
+    
+    return True, f"Filled in {updated} of {examined} reports without an area", updated
+
+@cached('reports')
+@timed
+def get_report_by_id(report_id):
+    """
+    Get a single report by ID
+    
+    Args:
+        report_id: Report ID
+    
+    Returns:
+        Report or None: The report if found, None otherwise
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = _report_factory
+    
+    try:
+        cursor.execute(f'''
+            SELECT {REPORT_COLUMNS}
             FROM reports
             WHERE id = ?
         ''', (report_id,))
         
         row = cursor.fetchone()
-        conn.close()
         
         if row:
-            return {
-                'id': row['id'],
-                'user_id': row['user_id'],
-                'username': row['username'],
-                'latitude': row['latitude'],
-                'longitude': row['longitude'],
-                'readable_area': row['readable_area'],
-                'photo_path': row['photo_path'],
-                'waste_type': row['waste_type'],
-                'date_time': row['date_time'],
-                'description': row['description'],
-                'severity': row['severity'],
-                'landmark': row['landmark'],
-                'report_status': row['report_status'],
-                'created_at': row['created_at']
-            }
+            return row
         return None
     
     except sqlite3.Error as e:
-        conn.close()
+        conn.rollback()
+        dont_cache()
         return None
-
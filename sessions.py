@@ -0,0 +1,321 @@
+"""
+============================================
+WASTEWATCH - SESSIONS.PY
+Server-side sessions with pluggable stores and revocation
+
+The session cookie holds only a random session ID. Session data lives
+in a store keyed by a SHA-256 of that ID, so a leaked store can't be
+replayed as cookies, and sessions can be revoked (one, or all of a
+user's) by deleting them from the store.
+============================================
+"""
+
+import hashlib
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+
+import auth
+from assets import UPLOAD_URL_PATH
+
+# Session ID entropy (bytes, before URL-safe base64 encoding)
+SESSION_ID_BYTES = 32
+
+# Sessions expire after PERMANENT_SESSION_LIFETIME without use. Their expiry
+# is pushed back at most this often, so ordinary page views don't write.
+REFRESH_INTERVAL = 3600  # seconds
+
+# Expired sessions are deleted from a store at most this often
+PURGE_INTERVAL = 600  # seconds
+
+SESSION_STORES = ('sqlite', 'memory')
+
+def _store_key(session_id):
+    """Store key for a session ID"""
+    return hashlib.sha256(session_id.encode()).hexdigest()
+
+class MemorySessionStore:
+    """
+    In-process session store
+    
+    Sessions are lost on restart and not shared between worker processes,
+    so this suits a single-process server or development only.
+    """
+    
+    def __init__(self):
+        self._sessions = {}  # key -> (data, user_id, expires_at)
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+    
+    def load(self, key):
+        """
+        Args:
+            key: Store key
+        
+        Returns:
+            tuple or None: (data: str, expires_at: float), None if missing or expired
+        """
+        entry = self._sessions.get(key)
+        if entry is None or entry[2] <= time.time():
+            return None
+        return entry[0], entry[2]
+    
+    def save(self, key, data, user_id, expires_at):
+        """Insert or replace a session"""
+        now = time.time()
+        with self._lock:
+            self._sessions[key] = (data, user_id, expires_at)
+            if now >= self._next_purge:
+                self._next_purge = now + PURGE_INTERVAL
+                for expired in [key for key, entry in self._sessions.items() if entry[2] <= now]:
+                    del self._sessions[expired]
+    
+    def delete(self, key):
+        """Remove one session"""
+        with self._lock:
+            self._sessions.pop(key, None)
+    
+    def delete_user(self, user_id):
+        """
+        Remove every session of a user
+        
+        Returns:
+            int: Sessions removed
+        """
+        with self._lock:
+            keys = [key for key, entry in self._sessions.items() if entry[1] == user_id]
+            for key in keys:
+                del self._sessions[key]
+        return len(keys)
+
+class SQLiteSessionStore:
+    """
+    Session store in the sessions table of a SQLite database
+    
+    Shared by every worker process using the same database file; the
+    table is created by auth.db's migrations.
+    """
+    
+    def __init__(self, get_db_connection):
+        """
+        Args:
+            get_db_connection: Callable returning this thread's connection
+        """
+        self.get_db_connection = get_db_connection
+        self._next_purge = 0.0
+    
+    def load(self, key):
+        """
+        Args:
+            key: Store key
+        
+        Returns:
+            tuple or None: (data: str, expires_at: float), None if missing or expired
+        """
+        conn = self.get_db_connection()
+        try:
+            row = conn.execute(
+                'SELECT data, expires_at FROM sessions WHERE key = ? AND expires_at > ?',
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Session load failed: {e}")
+            return None
+        return (row['data'], row['expires_at']) if row else None
+    
+    def save(self, key, data, user_id, expires_at):
+        """Insert or replace a session, purging expired ones now and then"""
+        conn = self.get_db_connection()
+        now = time.time()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (key, user_id, data, expires_at) VALUES (?, ?, ?, ?)',
+                (key, user_id, data, expires_at)
+            )
+            if now >= self._next_purge:
+                self._next_purge = now + PURGE_INTERVAL
+                conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,))
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Session save failed: {e}")
+    
+    def delete(self, key):
+        """Remove one session"""
+        conn = self.get_db_connection()
+        try:
+            conn.execute('DELETE FROM sessions WHERE key = ?', (key,))
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Session delete failed: {e}")
+    
+    def delete_user(self, user_id):
+        """
+        Remove every session of a user
+        
+        Returns:
+            int: Sessions removed
+        """
+        conn = self.get_db_connection()
+        try:
+            removed = conn.execute('DELETE FROM sessions WHERE user_id = ?', (user_id,)).rowcount
+            conn.commit()
+            return removed
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Session revocation failed: {e}")
+            return 0
+
+class ServerSession(CallbackDict, SessionMixin):
+    """
+    Session dict that tracks changes and reads and knows its session ID
+    
+    Like Flask's cookie session, accessed is only set once the session is
+    read or written, so responses that never touch it don't vary on Cookie.
+    """
+    
+    accessed = False
+    
+    def __init__(self, initial=None, session_id=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+        super().__init__(initial, on_update)
+        self.session_id = session_id
+        self.expires_at = expires_at
+        self.new = session_id is None
+        self.modified = False
+        self.rotate = False
+    
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+    
+    def __contains__(self, key):
+        self.accessed = True
+        return super().__contains__(key)
+    
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+    
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+    
+    def regenerate(self):
+        """Move the session to a new ID when it is saved - call on sign in against session fixation"""
+        self.rotate = True
+        self.modified = True
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Flask session interface backed by a session store
+    
+    Nothing is stored and no cookie is set until a session has data, so
+    anonymous visitors cost nothing. Clearing a session (logging out)
+    deletes it from the store.
+    """
+    
+    serializer = session_json_serializer
+    
+    def __init__(self, store):
+        self.store = store
+    
+    def open_session(self, app, request):
+        # Static files and photos never use the session, so don't look it up for
+        # them. The URL isn't matched yet when the session opens, hence the path check.
+        if request.path.startswith((app.static_url_path + '/', UPLOAD_URL_PATH + '/')):
+            return ServerSession()
+        
+        session_id = request.cookies.get(self.get_cookie_name(app))
+        if session_id:
+            entry = self.store.load(_store_key(session_id))
+            if entry is not None:
+                data, expires_at = entry
+                try:
+                    return ServerSession(self.serializer.loads(data), session_id, expires_at)
+                except ValueError:
+                    pass
+        return ServerSession()
+    
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+        
+        if session.accessed:
+            response.vary.add('Cookie')
+        
+        if not session:
+            if not session.new:
+                self.store.delete(_store_key(session.session_id))
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+        
+        now = time.time()
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        stale = session.expires_at is not None and session.expires_at - now < lifetime - REFRESH_INTERVAL
+        if not (session.new or session.modified or stale):
+            return
+        
+        if session.rotate and not session.new:
+            self.store.delete(_store_key(session.session_id))
+        if session.new or session.rotate:
+            session.session_id = secrets.token_urlsafe(SESSION_ID_BYTES)
+        
+        session.expires_at = now + lifetime
+        self.store.save(_store_key(session.session_id), self.serializer.dumps(dict(session)),
+                        session.get('user_id'), session.expires_at)
+        
+        if session.new or session.rotate or session.permanent:
+            response.set_cookie(name, session.session_id, expires=self.get_expiration_time(app, session),
+                                domain=domain, path=path, secure=secure, samesite=samesite,
+                                httponly=httponly)
+
+_store = None
+
+def configure_sessions(app):
+    """
+    Serve the app's sessions from the store named by SESSION_STORE
+    
+    Args:
+        app: Flask app; SESSION_STORE is 'sqlite' (auth.db, shared by all
+            workers) or 'memory' (this process only)
+    """
+    global _store
+    backend = app.config.get('SESSION_STORE', 'sqlite')
+    if backend == 'sqlite':
+        _store = SQLiteSessionStore(auth.get_db_connection)
+    elif backend == 'memory':
+        _store = MemorySessionStore()
+    else:
+        raise ValueError(f"Unknown session store: {backend} (expected one of {', '.join(SESSION_STORES)})")
+    app.session_interface = ServerSessionInterface(_store)
+
+def get_session_store():
+    """Return the configured session store"""
+    return _store
+
+def revoke_user_sessions(user_id):
+    """
+    Sign a user out everywhere by deleting all of their sessions
+    
+    Args:
+        user_id: User's ID
+    
+    Returns:
+        int: Sessions revoked
+    """
+    if _store is None:
+        return 0
+    return _store.delete_user(user_id)
@@ -0,0 +1,131 @@
+"""
+============================================
+WASTEWATCH - UPLOADS.PY
+Content-addressed storage for uploaded photos
+============================================
+"""
+
+import hashlib
+import os
+import tempfile
+
+# Bytes read per chunk while streaming an upload to disk
+CHUNK_SIZE = 64 * 1024
+
+def blob_path(digest, extension):
+    """
+    Path of a stored blob relative to the upload folder, sharded by the first bytes of its hash
+    
+    Args:
+        digest: SHA-256 hex digest of the content
+        extension: File extension without the dot
+    
+    Returns:
+        str: e.g. 'ab/cd/abcd....jpg'
+    """
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+class UploadSpool:
+    """
+    Temporary file in the upload folder that hashes what is written to it
+    
+    Used as Werkzeug's stream for uploaded files (see UploadRequest in
+    app.py), so a request body is written to disk once, straight into the
+    upload store, instead of spooled by Werkzeug and then copied. Reads and
+    seeks go to the underlying file. Unless store() moves it to its content
+    address, close() deletes it.
+    """
+    
+    def __init__(self, upload_folder):
+        """
+        Args:
+            upload_folder: Root upload folder
+        """
+        self.upload_folder = upload_folder
+        fd, self.temp_path = tempfile.mkstemp(dir=upload_folder, prefix='.upload-', suffix='.tmp')
+        self._file = os.fdopen(fd, 'w+b')
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data):
+        """Append data, hashing it on the way"""
+        self._sha256.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+    
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+    
+    def store(self, extension):
+        """
+        Move the spooled data to its content address
+        
+        If that blob already exists the spooled copy is discarded and the
+        existing blob is reused.
+        
+        Args:
+            extension: File extension without the dot
+        
+        Returns:
+            tuple: (path relative to upload_folder: str, is_new: bool)
+        """
+        self._file.close()
+        relative_path = blob_path(self._sha256.hexdigest(), extension)
+        path = os.path.join(self.upload_folder, relative_path)
+        if os.path.exists(path):
+            self.close()
+            return relative_path, False
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self.temp_path, path)
+        self.temp_path = None
+        return relative_path, True
+    
+    def close(self):
+        """Close the file, deleting it if it was never stored"""
+        self._file.close()
+        if self.temp_path is not None:
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+            self.temp_path = None
+
+def store_stream(stream, extension, upload_folder):
+    """
+    Stream a file into the upload store, deduplicating by content
+    
+    The data is copied in CHUNK_SIZE pieces to an UploadSpool while its
+    SHA-256 is computed, then atomically renamed to its content address.
+    
+    Args:
+        stream: Readable binary file object
+        extension: File extension without the dot
+        upload_folder: Root upload folder
+    
+    Returns:
+        tuple: (path relative to upload_folder: str, is_new: bool)
+    """
+    spool = UploadSpool(upload_folder)
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk)
+        return spool.store(extension)
+    finally:
+        spool.close()
+
+def store_file(source_path, upload_folder):
+    """
+    Copy a local file into the upload store
+    
+    Args:
+        source_path: Path of the file to import
+        upload_folder: Root upload folder
+    
+    Returns:
+        tuple: (path relative to upload_folder: str, is_new: bool)
+    """
+    extension = os.path.splitext(source_path)[1].lstrip('.').lower()
+    with open(source_path, 'rb') as source:
+        return store_stream(source, extension, upload_folder)
@@ -0,0 +1,25 @@
+"""
+============================================
+WASTEWATCH - WSGI.PY
+Production entry point
+
+Each worker process imports this module and builds its own app, so it
+runs the schema check and warmup once at startup. Settings come from
+environment variables (see app.default_config): at least SECRET_KEY,
+plus AUTH_DB_PATH, REPORTS_DB_PATH and UPLOAD_FOLDER if the defaults
+relative to the working directory don't suit.
+
+Serving:
+    gunicorn -c gunicorn.conf.py wsgi:app
+    waitress-serve --threads=8 --port=8000 wsgi:app    (Windows)
+
+Both databases use WAL and one connection per thread, so any mix of
+worker processes and threads can share them. Don't preload the app
+before forking workers (gunicorn --preload): SQLite connections must
+not be carried across a fork.
+============================================
+"""
+
+from app import create_app
+
+app = create_app()